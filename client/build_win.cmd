@@ -17,7 +17,17 @@ py -m PyInstaller --noconfirm --onefile --name Facepost ^
   --add-data "config.json;." ^
   facepost_client.py
 
+REM one-folder: fara despachetare in TEMP la fiecare pornire (instalare versionata app-<ver>\ + current)
+echo === Build one-folder ===
+py -m PyInstaller --noconfirm --onedir --name Facepost ^
+  --add-data "config.json;." ^
+  facepost_client.py
+
+echo === Arhiva one-folder ===
+powershell -NoProfile -Command "Compress-Archive -Force -Path dist\Facepost -DestinationPath dist\Facepost-onedir.zip"
+
 echo.
 echo === GATA ===
 echo Executabil: dist\Facepost.exe
+echo One-folder: dist\Facepost\Facepost.exe  (arhiva: dist\Facepost-onedir.zip)
 pause
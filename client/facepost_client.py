@@ -1,9 +1,16 @@
+from __future__ import annotations
+
+import time
+
+_T_IMPORT_START = time.perf_counter()
+
 import os
 import sys
 import json
-import time
 import threading
+import queue
 import hashlib
+import hmac
 from pathlib import Path
 from datetime import datetime, timedelta, time as dtime, timezone
 import platform
@@ -11,20 +18,37 @@ import tempfile
 import shutil
 import webbrowser
 import subprocess
-import ctypes
-from ctypes import wintypes
-
-import requests
-import tkinter as tk
-from tkinter import messagebox, filedialog
+import atexit
+import random
+import bisect
+import heapq
+import itertools
+import uuid
+import re
+import html
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+# Importurile grele (selenium, requests, ctypes, tkinter) sunt amânate până
+# la prima folosire, ca pornirea (și importul din tooling) să fie rapidă.
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+tk = None
+messagebox = None
+filedialog = None
+
+
+def load_tk():
+    """Importă tkinter la cerere și îl expune ca `tk`, `messagebox`, `filedialog`."""
+    global tk, messagebox, filedialog
+    if tk is None:
+        import tkinter
+        from tkinter import messagebox as _messagebox, filedialog as _filedialog
+
+        tk, messagebox, filedialog = tkinter, _messagebox, _filedialog
+    return tk
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import WebDriverException
-from selenium.webdriver.common.keys import Keys
 
 # ================== UI THEME ==================
 
@@ -46,6 +70,11 @@ COLORS = {
 APP_NAME = "Facepost"
 API_URL = "https://facepost.onrender.com"
 CONFIG_FILE = Path.home() / ".facepost_config.json"
+CONTENT_DIR = Path.home() / ".facepost_content"
+LICENSE_CACHE_FILE = Path.home() / ".facepost_license.json"
+OUTBOX_FILE = Path.home() / ".facepost_outbox.sqlite3"
+UPDATE_CACHE_FILE = Path.home() / ".facepost_update_cache.json"
+SELECTOR_STATS_FILE = Path.home() / ".facepost_selectors.json"
 CHROMEDRIVER_NAME = "chromedriver.exe"  # în același folder cu EXE-ul
 LOGIN_DRIVER: webdriver.Chrome | None = None
 CLIENT_VERSION = "3.1.3"
@@ -58,17 +87,34 @@ DEFAULT_CONFIG = {
     "device_id": "",
     "server_url": API_URL,
     "chrome_profile_dir": "",
-    "schedule_enabled_morning": False,
-    "schedule_time_morning": "08:00",
-    "schedule_enabled_evening": False,
-    "schedule_time_evening": "20:00",
+    # rundele zilnice: {"id", "time": "HH:MM", "days": "lu-vi,du" ("" = zilnic), "enabled"};
+    # "morning" / "evening" sunt cele din UI, restul se adaugă direct în config
+    "schedule_slots": [],
+    # zile fără runde zilnice ("AAAA-LL-ZZ")
+    "schedule_exclude_dates": [],
+    # ultima zi în care a rulat fiecare slot (id -> "AAAA-LL-ZZ")
+    "schedule_last_runs": {},
     "interval_enabled": False,
     "interval_minutes": 60,
+    "delay_seconds": 120,
+    "simulate": False,
+    # Chrome rămâne deschis între rulări; se închide după atâtea minute fără folosire (0 = după fiecare rulare)
+    "chrome_keep_alive_minutes": 20,
+    # pornim Chrome + Facebook înainte de rundele zilnice; 0 = avans învățat din pornirile recente
+    "chrome_prewarm_enabled": True,
+    "chrome_prewarm_lead_sec": 0,
+    "chrome_launch_history": [],
+    # clasamentul selectorilor se ține per limbă Facebook; opțional și per grup
+    "selector_stats_per_group": False,
+}
+
+# Conținutul voluminos (text postare, lista de grupuri, imagini) NU stă în
+# fișierul de setări: e salvat în CONTENT_DIR după hash, iar config-ul
+# păstrează doar referința "<cheie>_ref". Se citește cu get_content().
+CONTENT_DEFAULTS = {
     "post_text": "",
     "groups_text": "",
     "images": [],
-    "delay_seconds": 120,
-    "simulate": False,
 }
 
 
@@ -80,6 +126,123 @@ def stable_fingerprint() -> str:
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
 
 
+def content_digest(value) -> str:
+    """SHA-256 pentru conținut: textul brut (UTF-8) sau JSON canonic pentru liste."""
+    if isinstance(value, str):
+        raw = value.encode("utf-8")
+    else:
+        raw = json.dumps(
+            value, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ContentStore:
+    """
+    Depozit de conținut adresat prin hash (un fișier JSON per digest).
+    Un blob se scrie o singură dată – dacă hash-ul există deja, nu atingem discul.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._cache: dict[str, object] = {}
+
+    def _path(self, digest: str) -> Path:
+        return self.root / f"{digest}.json"
+
+    def put(self, value) -> str:
+        digest = content_digest(value)
+        with self._lock:
+            self._cache[digest] = value
+            path = self._path(digest)
+            if not path.exists():
+                self.root.mkdir(parents=True, exist_ok=True)
+                atomic_write_text(path, json.dumps(value, ensure_ascii=False))
+        return digest
+
+    def get(self, digest: str, default=None):
+        with self._lock:
+            if digest in self._cache:
+                return self._cache[digest]
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except Exception as e:
+            print("[CONTENT] Nu pot citi conținutul", digest[:12], ":", e)
+            return default
+        if content_digest(value) != digest:
+            print("[CONTENT] Conținut corupt (hash diferit):", digest[:12])
+            return default
+        with self._lock:
+            self._cache[digest] = value
+        return value
+
+    def gc(self, keep: set[str]) -> None:
+        """Șterge blob-urile care nu mai sunt referite."""
+        if not self.root.exists():
+            return
+        with self._lock:
+            for path in self.root.glob("*.json"):
+                if path.stem not in keep:
+                    try:
+                        path.unlink()
+                        self._cache.pop(path.stem, None)
+                    except OSError:
+                        pass
+
+
+CONTENT_STORE = ContentStore(CONTENT_DIR)
+# ultima valoare serializată per cheie -> digest; evită re-hash-ul listei de
+# grupuri la fiecare salvare de flag (comparăm identitatea obiectului)
+_CONTENT_REFS: dict[str, tuple[object, str]] = {}
+# chei al căror blob lipsește / e corupt; referința rămâne în config
+MISSING_CONTENT: set[str] = set()
+
+
+def get_content(cfg: dict, key: str):
+    """
+    Întoarce conținutul `key` (post_text / groups_text / images), încărcat la cerere.
+    Dacă blob-ul referit lipsește sau e corupt, întoarce valoarea goală, dar nu
+    o memorează: `<key>_ref` rămâne în config (nu e suprascris la următoarea
+    salvare automată), iar cheia e notată în MISSING_CONTENT pentru UI.
+    """
+    if key in cfg:
+        return cfg[key]
+    default = CONTENT_DEFAULTS[key]
+    ref = cfg.get(f"{key}_ref")
+    if not ref:
+        return default.copy() if isinstance(default, list) else default
+    value = CONTENT_STORE.get(ref)
+    if value is None:
+        print(f"[CONTENT] ATENȚIE: conținutul pentru {key} ({ref[:12]}) nu poate fi citit; păstrez referința.")
+        MISSING_CONTENT.add(key)
+        return default.copy() if isinstance(default, list) else default
+    cfg[key] = value
+    _CONTENT_REFS[key] = (value, ref)
+    return value
+
+
+def config_to_json(cfg: dict) -> str:
+    """
+    Serializează setările; conținutul voluminos e mutat în CONTENT_STORE
+    (scris doar dacă s-a schimbat) și înlocuit cu referința lui.
+    """
+    data = dict(cfg)
+    for key in CONTENT_DEFAULTS:
+        if key not in data:
+            continue
+        value = data.pop(key)
+        cached = _CONTENT_REFS.get(key)
+        if cached is not None and cached[0] is value:
+            digest = cached[1]
+        else:
+            digest = CONTENT_STORE.put(value)
+            _CONTENT_REFS[key] = (value, digest)
+        data[f"{key}_ref"] = digest
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
 def load_config() -> dict:
     if CONFIG_FILE.exists():
         try:
@@ -110,28 +273,454 @@ def load_config() -> dict:
         cfg["schedule_enabled_morning"] = True
         cfg["schedule_time_morning"] = cfg.get("schedule_time", "08:00")
 
+    # migrare dimineață/seară -> schedule_slots + schedule_last_runs
+    if "schedule_slots" not in data:
+        cfg["schedule_slots"] = [
+            {
+                "id": which,
+                "time": cfg.get(f"schedule_time_{which}") or default_time,
+                "days": "",
+                "enabled": bool(cfg.get(f"schedule_enabled_{which}")),
+            }
+            for which, default_time in (("morning", "08:00"), ("evening", "20:00"))
+        ]
+        cfg["schedule_last_runs"] = {
+            which: cfg[f"last_run_{which}"]
+            for which in ("morning", "evening")
+            if cfg.get(f"last_run_{which}")
+        }
+    for old_key in (
+        "schedule_enabled", "schedule_time",
+        "schedule_enabled_morning", "schedule_time_morning", "last_run_morning",
+        "schedule_enabled_evening", "schedule_time_evening", "last_run_evening",
+    ):
+        cfg.pop(old_key, None)
+    cfg["schedule_slots"] = [dict(slot) for slot in cfg.get("schedule_slots") or []]
+    cfg["schedule_exclude_dates"] = list(cfg.get("schedule_exclude_dates") or [])
+    cfg["schedule_last_runs"] = dict(cfg.get("schedule_last_runs") or {})
+
+    # migrare format vechi: post_text / groups_text / images direct în config.
+    # Rămân în memorie, iar prima salvare le mută în CONTENT_STORE.
+    if any(key in data for key in CONTENT_DEFAULTS):
+        cfg["_needs_content_migration"] = True
+
     return cfg
 
 
-def save_config(cfg: dict) -> None:
+def atomic_write_text(path: Path, text: str) -> None:
+    """Scrie fișierul atomic: fișier temporar în același folder + os.replace."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("Eroare la salvare config:", e)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ConfigPersister:
+    """
+    Salvează config-ul pe disc dintr-un thread de fundal.
+
+    - rafalele de save_config() (bife, toggle-uri, scheduler) se comasează
+      într-o singură scriere, după `delay` secunde de liniște
+      (dar nu mai târziu de `max_delay` de la prima modificare)
+    - scrierea e atomică (temp + rename), deci un crash nu trunchiază config-ul
+    - scrierile sunt serializate, indiferent din ce thread vin
+    - flush() scrie imediat ce e în așteptare (folosit la ieșire)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        serialize=config_to_json,
+        delay: float = 0.5,
+        max_delay: float = 3.0,
+    ):
+        self.path = path
+        self.serialize = serialize
+        self.delay = delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending: dict | None = None
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, cfg: dict) -> None:
+        now = time.monotonic()
+        with self._cond:
+            if self._pending is None:
+                self._first_change = now
+            self._pending = cfg
+            self._last_change = now
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="ConfigPersister", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self) -> None:
+        with self._cond:
+            cfg, self._pending = self._pending, None
+        if cfg is not None:
+            self._write(cfg)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                # debounce: așteptăm să se liniștească rafala de modificări
+                while self._pending is not None:
+                    now = time.monotonic()
+                    due = min(
+                        self._last_change + self.delay,
+                        self._first_change + self.max_delay,
+                    )
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+                cfg, self._pending = self._pending, None
+            if cfg is not None:
+                self._write(cfg)
+
+    def _write(self, cfg: dict) -> None:
+        with self._write_lock:
+            try:
+                # snapshot: CONFIG poate fi modificat între timp din alt thread
+                text = self.serialize(dict(cfg))
+                atomic_write_text(self.path, text)
+            except Exception as e:
+                print("Eroare la salvare config:", e)
+
+
+CONFIG_PERSISTER = ConfigPersister(CONFIG_FILE)
+atexit.register(CONFIG_PERSISTER.flush)
+
+
+def save_config(cfg: dict, immediate: bool = False) -> None:
+    """
+    Programează salvarea config-ului (scriere comasată, în fundal).
+    immediate=True scrie imediat (ex: butonul "Salvează config").
+    """
+    CONFIG_PERSISTER.schedule(cfg)
+    if immediate:
+        CONFIG_PERSISTER.flush()
+
+
+# CONFIG se populează în main() prin init_config(); la import modulul nu
+# atinge home-ul utilizatorului.
+CONFIG: dict = {}
 
 
-CONFIG = load_config()
-# forțăm mereu același server URL (nu se poate modifica din UI)
-CONFIG["server_url"] = API_URL
+def init_config() -> dict:
+    """Încarcă config-ul de pe disc în CONFIG (același obiect, actualizat in-place)."""
+    CONFIG.clear()
+    CONFIG.update(load_config())
+    # forțăm mereu același server URL (nu se poate modifica din UI)
+    CONFIG["server_url"] = API_URL
+
+    if CONFIG.pop("_needs_content_migration", False):
+        print("[CONFIG] Mut conținutul voluminos din config în", CONTENT_DIR)
+        save_config(CONFIG, immediate=True)
+    else:
+        # păstrăm și conținutul încă necesar telemetriei netrimise din outbox
+        keep = {CONFIG[f"{key}_ref"] for key in CONTENT_DEFAULTS if CONFIG.get(f"{key}_ref")}
+        try:
+            keep |= RUN_OUTBOX.referenced_digests()
+            CONTENT_STORE.gc(keep)
+        except Exception as e:
+            print("[CONTENT] Curățenie sărită:", e)
+    return CONFIG
 
 
 # ================== API LICENȚE & LOGS ==================
 
+# timeout-uri per endpoint: (connect, read) în secunde
+API_TIMEOUTS = {
+    "/check": (5, 15),
+    "/bind": (5, 15),
+    "/log_run": (5, 20),
+    "/client-version": (5, 10),
+    "/client-download": (5, 10),
+}
+API_DEFAULT_TIMEOUT = (5, 15)
+# endpoint-uri care pot fi reîncercate fără efecte duble pe server
+API_IDEMPOTENT = {"/check", "/bind", "/client-version", "/client-download"}
+# coduri HTTP tranzitorii (Render restart / rate limit) -> merită retry
+API_RETRY_STATUS = {429, 502, 503, 504}
+
+# Render adoarme serviciul după ~15 min fără trafic; primul request după
+# aceea durează 20–40 s. În situația asta folosim un timeout de citire lung.
+BACKEND_IDLE_SEC = 15 * 60
+BACKEND_COLD_READ_TIMEOUT = 60.0
+BACKEND_MAX_READ_TIMEOUT = 30.0
+# cu cât timp înainte de o rundă programată "trezim" backend-ul
+BACKEND_WARMUP_LEAD_SEC = 120
+
+
+class BackendUnavailable(Exception):
+    """Circuit breaker-ul e deschis – nu mai trimitem request-uri o vreme."""
+
+
+class LatencyTracker:
+    """
+    Urmărește latența backend-ului (medie + variație, ca RTO-ul din TCP)
+    și propune timeout-ul de citire pentru următorul request.
+    """
+
+    def __init__(self, alpha: float = 0.125, beta: float = 0.25):
+        self.alpha = alpha
+        self.beta = beta
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.last_ok = 0.0  # time.monotonic() al ultimului răspuns primit
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            if self.srtt is None:
+                self.srtt = seconds
+                self.rttvar = seconds / 2
+            else:
+                self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - seconds)
+                self.srtt = (1 - self.alpha) * self.srtt + self.alpha * seconds
+            self.last_ok = time.monotonic()
+
+    def is_cold(self) -> bool:
+        """Backend-ul probabil doarme (n-am mai vorbit cu el de mult / deloc)."""
+        return not self.last_ok or time.monotonic() - self.last_ok > BACKEND_IDLE_SEC
+
+    def read_timeout(self, floor: float) -> float:
+        if self.is_cold():
+            return max(floor, BACKEND_COLD_READ_TIMEOUT)
+        with self._lock:
+            if self.srtt is None:
+                return floor
+            adaptive = self.srtt + 4 * self.rttvar
+        return min(max(floor, adaptive), BACKEND_MAX_READ_TIMEOUT)
+
+
+class CircuitBreaker:
+    """
+    closed    -> request-urile trec normal
+    open      -> după `threshold` eșecuri consecutive refuzăm local, fără rețea,
+                 pentru `cooldown` secunde (dublat la fiecare probă eșuată)
+    half_open -> după cooldown lăsăm O singură probă; succes => closed
+                 (o probă fără rezultat după PROBE_TIMEOUT_SEC e considerată pierdută)
+    """
+
+    PROBE_TIMEOUT_SEC = 120.0
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self, probe: bool = False) -> bool:
+        """probe=True (warm-up) poate testa backend-ul chiar dacă circuitul e deschis."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if not probe and time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if (
+                self._probe_in_flight
+                and time.monotonic() - self._probe_started < self.PROBE_TIMEOUT_SEC
+            ):
+                return False
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+
+    def release_probe(self) -> None:
+        """Proba s-a încheiat fără verdict (eroare locală, nu a serverului)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                print("[API] Backend-ul răspunde din nou – circuit închis.")
+            self.state = "closed"
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            elif self.failures < self.threshold:
+                return
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+            print(f"[API] Backend indisponibil – circuit deschis pentru {self.cooldown:.0f}s.")
+
+
+class ApiClient:
+    """
+    Client HTTP comun pentru backend-ul Facepost.
+
+    - o singură requests.Session (connection pool + keep-alive TLS)
+    - retry limitat cu backoff exponențial și jitter, doar pentru apeluri
+      idempotente (pentru restul doar dacă nici nu s-a putut conecta)
+    - timeout per endpoint (API_TIMEOUTS), prelungit adaptiv după latența
+      observată și la cold start-ul Render
+    - circuit breaker: când backend-ul pică, nu mai așteptăm timeout după timeout
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker()
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = f"{APP_NAME}/{CLIENT_VERSION}"
+                self._session = session
+            return self._session
+
+    def _backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # "full jitter": clienții nu reîncearcă toți în același moment
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        idempotent: bool | None = None,
+        timeout=None,
+        probe: bool = False,
+        **kwargs,
+    ):
+        """
+        Face request-ul către `server_url + path` și întoarce obiectul Response.
+        Aruncă excepția requests dacă toate încercările eșuează, respectiv
+        BackendUnavailable dacă circuitul e deschis.
+        """
+        from requests.exceptions import ConnectionError as ReqConnectionError
+        from requests.exceptions import ConnectTimeout, RequestException, Timeout
+
+        url = f"{CONFIG.get('server_url', API_URL).rstrip('/')}{path}"
+        if idempotent is None:
+            idempotent = path in API_IDEMPOTENT
+        attempts = 1 + self.max_retries
+
+        for attempt in range(attempts):
+            last = attempt + 1 >= attempts
+            if not self.breaker.allow(probe=probe):
+                raise BackendUnavailable(
+                    "serverul nu răspunde momentan, reîncerc automat în curând"
+                )
+            if timeout is None:
+                connect_t, read_t = API_TIMEOUTS.get(path, API_DEFAULT_TIMEOUT)
+                req_timeout = (connect_t, self.latency.read_timeout(read_t))
+            else:
+                req_timeout = timeout
+            started = time.monotonic()
+            try:
+                r = self.session.request(method, url, timeout=req_timeout, **kwargs)
+            except ConnectTimeout:
+                self.breaker.record_failure()
+                # conexiunea nu s-a stabilit -> request-ul n-a ajuns la server
+                if last:
+                    raise
+                delay = self._backoff(attempt)
+            except (ReqConnectionError, Timeout):
+                self.breaker.record_failure()
+                if last or not idempotent:
+                    raise
+                delay = self._backoff(attempt)
+            except RequestException:
+                # SSL, redirect-uri, răspuns trunchiat etc.: tot un eșec, fără retry
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # eroare locală: proba (dacă era una) nu trebuie să rămână agățată
+                self.breaker.release_probe()
+                raise
+            else:
+                if r.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.latency.record(time.monotonic() - started)
+                    self.breaker.record_success()
+                if r.status_code not in API_RETRY_STATUS or last or not idempotent:
+                    return r
+                delay = self._backoff(attempt, r.headers.get("Retry-After"))
+                r.close()
+            print(
+                f"[API] {method} {path} eșuat (încercarea {attempt + 1}/{attempts}), "
+                f"reîncerc în {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+API_CLIENT = ApiClient()
+
+
+def warm_up_backend() -> None:
+    """
+    Ping ieftin (GET /client-version) ca să trezim backend-ul de pe Render
+    înainte de o rundă programată. Servește și ca probă half-open pentru
+    circuit breaker. Rulează în fundal, nu blochează apelantul.
+    """
+
+    def _ping():
+        started = time.monotonic()
+        try:
+            r = API_CLIENT.request("GET", "/client-version", probe=True)
+            r.close()
+            print(f"[API] Warm-up backend OK în {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            print("[API] Warm-up backend eșuat:", e)
+
+    threading.Thread(target=_ping, name="BackendWarmup", daemon=True).start()
+
+
 def api_post(path: str, payload: dict) -> dict:
-    url = f"{CONFIG.get('server_url', API_URL).rstrip('/')}{path}"
     try:
-        r = requests.post(url, json=payload, timeout=15)
+        r = API_CLIENT.request("POST", path, json=payload)
         try:
             data = r.json()
         except Exception:
@@ -142,67 +731,969 @@ def api_post(path: str, payload: dict) -> dict:
         return {"error": str(e), "_http": 0}
 
 
-def bind_license(email: str, fingerprint: str) -> dict:
-    """Leagă device-ul de licență: POST /bind"""
-    return api_post("/bind", {"email": email, "fingerprint": fingerprint})
+def bind_license(email: str, fingerprint: str) -> dict:
+    """Leagă device-ul de licență: POST /bind"""
+    resp = api_post("/bind", {"email": email, "fingerprint": fingerprint})
+    if not is_transient_api_error(resp):
+        # statusul licenței s-a schimbat -> următorul check merge la server
+        LICENSE_CACHE.clear()
+    return resp
+
+
+def check_license(email: str, fingerprint: str) -> dict:
+    """Verifică licența pentru device: POST /check (și actualizează cache-ul local)."""
+    resp = api_post("/check", {"email": email, "fingerprint": fingerprint})
+    LICENSE_CACHE.update_from_response(email, fingerprint, resp)
+    return resp
+
+
+# ================== CACHE LICENȚĂ ==================
+
+# verdictul "ok" e folosit direct din cache cât timp e mai nou de TTL;
+# după REFRESH_AFTER îl reîmprospătăm în fundal, fără să blocăm rularea
+LICENSE_CACHE_TTL_SEC = 6 * 3600
+LICENSE_REFRESH_AFTER_SEC = 30 * 60
+# dacă serverul nu răspunde, acceptăm verdictul "ok" până la 72h vechime
+# (dar niciodată după expires_at)
+LICENSE_GRACE_SEC = 72 * 3600
+
+
+def parse_expires_at(value) -> datetime | None:
+    """
+    expires_at vine ca ISO (dată sau dată+oră); fără fus orar => UTC.
+    O dată simplă ("2026-12-31") e valabilă toată ziua: expiră la
+    începutul zilei următoare.
+    """
+    if not value:
+        return None
+    raw = str(value).strip()
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", raw):
+        dt += timedelta(days=1)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt
+
+
+def is_transient_api_error(resp: dict) -> bool:
+    """Eroare de rețea / server (nu un răspuns definitiv despre licență)."""
+    return bool(resp.get("error")) and (resp.get("_http", 0) == 0 or resp.get("_http", 0) >= 500)
+
+
+LICENSE_KEY_REG_PATH = r"Software\Facepost"
+LICENSE_KEY_FILE = Path.home() / ".facepost_license.key"
+_LICENSE_SECRET: bytes | None = None
+
+
+def license_cache_secret() -> bytes:
+    """
+    Cheie secretă per instalare pentru semnătura LicenseCache, ținută în
+    afara fișierului de cache: în registry (HKCU\\Software\\Facepost) pe
+    Windows, altfel într-un fișier separat. Se generează la prima folosire.
+    """
+    global _LICENSE_SECRET
+    if _LICENSE_SECRET is not None:
+        return _LICENSE_SECRET
+    secret = ""
+    if sys.platform == "win32":
+        import winreg
+
+        try:
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, LICENSE_KEY_REG_PATH) as key:
+                secret, _ = winreg.QueryValueEx(key, "cache_key")
+        except OSError:
+            secret = ""
+        if not secret:
+            secret = os.urandom(32).hex()
+            try:
+                with winreg.CreateKey(winreg.HKEY_CURRENT_USER, LICENSE_KEY_REG_PATH) as key:
+                    winreg.SetValueEx(key, "cache_key", 0, winreg.REG_SZ, secret)
+            except OSError as e:
+                print("[LICENȚĂ] Nu pot salva cheia cache-ului în registry:", e)
+    else:
+        try:
+            secret = LICENSE_KEY_FILE.read_text(encoding="utf-8").strip()
+        except OSError:
+            secret = ""
+        if not secret:
+            secret = os.urandom(32).hex()
+            try:
+                atomic_write_text(LICENSE_KEY_FILE, secret)
+                os.chmod(LICENSE_KEY_FILE, 0o600)
+            except OSError as e:
+                print("[LICENȚĂ] Nu pot salva cheia cache-ului:", e)
+    _LICENSE_SECRET = str(secret).encode("utf-8")
+    return _LICENSE_SECRET
+
+
+class LicenseCache:
+    """
+    Ultimul verdict "ok" de la /check, salvat local și semnat (HMAC) cu
+    fingerprint-ul device-ului plus o cheie per instalare ținută în afara
+    fișierului (license_cache_secret) – un fișier copiat pe alt PC sau
+    editat (și re-semnat) de mână nu e acceptat.
+    """
+
+    FIELDS = ("email", "fingerprint", "status", "expires_at", "is_trial", "note", "checked_at")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entry: dict | None = None
+        self._loaded = False
+
+    @staticmethod
+    def _sign(entry: dict, fingerprint: str) -> str:
+        msg = json.dumps(
+            {k: entry.get(k) for k in LicenseCache.FIELDS},
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        key = license_cache_secret() + b"|" + fingerprint.encode("utf-8")
+        return hmac.new(key, msg, hashlib.sha256).hexdigest()
+
+    def load(self, email: str, fingerprint: str) -> dict | None:
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._entry = json.load(f)
+                except FileNotFoundError:
+                    self._entry = None
+                except Exception as e:
+                    print("[LICENȚĂ] Cache ilizibil, îl ignor:", e)
+                    self._entry = None
+            entry = self._entry
+        if not entry or not fingerprint:
+            return None
+        if entry.get("email") != email or entry.get("fingerprint") != fingerprint:
+            return None
+        if not hmac.compare_digest(str(entry.get("sig", "")), self._sign(entry, fingerprint)):
+            print("[LICENȚĂ] Semnătura cache-ului nu corespunde – îl ignor.")
+            return None
+        return entry
+
+    def store(self, email: str, fingerprint: str, resp: dict) -> None:
+        entry = {
+            "email": email,
+            "fingerprint": fingerprint,
+            "status": resp.get("status"),
+            "expires_at": resp.get("expires_at"),
+            "is_trial": bool(resp.get("is_trial")),
+            "note": resp.get("note"),
+            "checked_at": time.time(),
+        }
+        entry["sig"] = self._sign(entry, fingerprint)
+        with self._lock:
+            self._entry = entry
+            self._loaded = True
+            try:
+                atomic_write_text(self.path, json.dumps(entry, ensure_ascii=False))
+            except Exception as e:
+                print("[LICENȚĂ] Nu pot salva cache-ul:", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
+            self._loaded = True
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print("[LICENȚĂ] Nu pot șterge cache-ul:", e)
+
+    def update_from_response(self, email: str, fingerprint: str, resp: dict) -> None:
+        """Păstrăm doar verdictele "ok"; orice răspuns definitiv diferit golește cache-ul."""
+        if is_transient_api_error(resp):
+            return
+        if not resp.get("error") and resp.get("status") == "ok":
+            self.store(email, fingerprint, resp)
+        else:
+            self.clear()
+
+
+LICENSE_CACHE = LicenseCache(LICENSE_CACHE_FILE)
+_LICENSE_REFRESH_LOCK = threading.Lock()
+
+
+def _verdict_from_cache(entry: dict, source: str) -> dict:
+    resp = {k: entry.get(k) for k in ("status", "expires_at", "is_trial", "note")}
+    resp["_http"] = 200
+    resp["_source"] = source
+    return resp
+
+
+def refresh_license_in_background(email: str, fingerprint: str) -> None:
+    """Reîmprospătează verdictul în fundal; un singur refresh simultan."""
+    if not _LICENSE_REFRESH_LOCK.acquire(blocking=False):
+        return
+
+    def _refresh():
+        try:
+            resp = check_license(email, fingerprint)
+            print("[LICENȚĂ] Refresh în fundal:", resp.get("status") or resp.get("error"))
+        finally:
+            _LICENSE_REFRESH_LOCK.release()
+
+    threading.Thread(target=_refresh, name="LicenseRefresh", daemon=True).start()
+
+
+def cached_check_license(email: str, fingerprint: str) -> dict:
+    """
+    Ca check_license(), dar folosește verdictul salvat când se poate:
+      - verdict "ok" proaspăt (< TTL, neexpirat) -> răspuns imediat, fără rețea
+        (+ refresh în fundal dacă e mai vechi de LICENSE_REFRESH_AFTER_SEC)
+      - altfel întreabă serverul; dacă serverul nu e disponibil și verdictul
+        salvat e în perioada de grație, îl folosim în continuare
+    Răspunsul are în plus "_source": "cache" / "grace" (lipsește dacă vine de la server).
+    """
+    entry = LICENSE_CACHE.load(email, fingerprint)
+    age = None
+    expired = False
+    if entry is not None:
+        age = time.time() - float(entry.get("checked_at") or 0)
+        exp = parse_expires_at(entry.get("expires_at"))
+        expired = exp is not None and exp <= datetime.now(UTC)
+        if 0 <= age < LICENSE_CACHE_TTL_SEC and not expired:
+            if age > LICENSE_REFRESH_AFTER_SEC:
+                refresh_license_in_background(email, fingerprint)
+            return _verdict_from_cache(entry, "cache")
+
+    resp = check_license(email, fingerprint)
+    if (
+        is_transient_api_error(resp)
+        and entry is not None
+        and not expired
+        and 0 <= age < LICENSE_GRACE_SEC
+    ):
+        print("[LICENȚĂ] Serverul nu răspunde – folosesc verdictul salvat (grație offline).")
+        return _verdict_from_cache(entry, "grace")
+    return resp
+
+
+def log_run(groups, text: str, images):
+    """
+    Pune în outbox (local, instant) un log simplu pentru fiecare RUN:
+    - email, fingerprint, group_urls, post_text, images_count
+    Trimiterea efectivă către /log_run o face RUN_OUTBOX în fundal.
+
+    Lista de grupuri și textul postării stau în CONTENT_STORE; outbox-ul
+    păstrează doar hash-urile lor, iar la trimitere conținutul complet
+    pleacă doar dacă serverul nu l-a confirmat deja (vezi RunOutbox).
+    """
+    email = (CONFIG.get("email") or "").strip().lower()
+    fingerprint = CONFIG.get("device_id") or ""
+    if not email:
+        return {"error": "no email in config"}
+
+    group_urls = "\n".join([g.strip() for g in (groups or []) if g.strip()])
+
+    payload = {
+        "email": email,
+        "fingerprint": fingerprint,
+        "group_urls_sha256": CONTENT_STORE.put(group_urls),
+        "post_text_sha256": CONTENT_STORE.put(text or ""),
+        "images_count": len(images or []),
+        # id unic: serverul poate ignora duplicatele dacă o intrare e retrimisă
+        "client_run_id": uuid.uuid4().hex,
+        "run_started_at": datetime.now(UTC).isoformat(timespec="seconds"),
+    }
+    RUN_OUTBOX.enqueue("/log_run", payload)
+    return {"queued": True, "client_run_id": payload["client_run_id"]}
+
+
+# ================== OUTBOX TELEMETRIE ==================
+
+class RunOutbox:
+    """
+    Coadă durabilă (SQLite) pentru telemetria trimisă la server.
+
+    - enqueue() scrie doar local, deci pornirea rundei nu așteaptă rețeaua
+    - un thread de fundal trimite intrările în ordine, câte un POST per
+      intrare (le citește din SQLite câte BATCH_SIZE); la eroare
+      tranzitorie se oprește și reîncearcă cu backoff exponențial + jitter
+    - dacă serverul respinge (400/422 cu eroare despre câmpuri necunoscute)
+      câmpurile noi (digest-uri, client_run_id),
+      intrarea e retrimisă în formatul vechi, iar serverul e ținut minte
+      ca "legacy" (re-verificat după LEGACY_RECHECK_SEC)
+    - intrările netrimise rămân pe disc și sunt retrimise după restart
+    - intrările confirmate se șterg; fișierul se compactează când coada e goală
+    - conținutul mare (grupuri, text) e deduplicat după hash: îl trimitem
+      complet până când serverul confirmă explicit că l-a păstrat (câmpul
+      "acked_digests" din răspuns), apoi doar digest-ul (tabela
+      acked_digests, păstrată între reporniri). Un server care nu știe de
+      digest-uri nu le confirmă, deci primește mereu conținutul complet.
+    """
+
+    # câmp conținut -> câmp digest în payload
+    DEDUP_FIELDS = {
+        "group_urls": "group_urls_sha256",
+        "post_text": "post_text_sha256",
+    }
+    MAX_ACKED_DIGESTS = 200
+    # câmpuri adăugate peste formatul vechi al /log_run
+    EXTENSION_FIELDS = ("client_run_id", "run_started_at")
+    LEGACY_RECHECK_SEC = 7 * 24 * 3600
+
+    BATCH_SIZE = 20
+    MAX_ROWS = 1000
+    MAX_AGE_SEC = 30 * 24 * 3600
+    BACKOFF_BASE_SEC = 30
+    BACKOFF_MAX_SEC = 3600
+    VACUUM_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._conn = None
+        self._thread: threading.Thread | None = None
+
+    def _db(self):
+        # apelat doar cu self._lock luat
+        if self._conn is None:
+            import sqlite3
+
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " endpoint TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS acked_digests ("
+                " server TEXT NOT NULL,"
+                " digest TEXT NOT NULL,"
+                " acked_at REAL NOT NULL,"
+                " PRIMARY KEY (server, digest))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS server_format ("
+                " server TEXT PRIMARY KEY,"
+                " format TEXT NOT NULL,"
+                " checked_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def start(self) -> None:
+        """Pornește flusher-ul (o singură dată); trimite ce a rămas de la rulările trecute."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="RunOutbox", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, endpoint: str, payload: dict) -> None:
+        try:
+            with self._lock:
+                self._db().execute(
+                    "INSERT INTO outbox (endpoint, payload, created_at) VALUES (?, ?, ?)",
+                    (endpoint, json.dumps(payload, ensure_ascii=False), time.time()),
+                )
+        except Exception as e:
+            print("[OUTBOX] Nu pot salva intrarea în outbox:", e)
+            return
+        self.start()
+        self._wake.set()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.BACKOFF_MAX_SEC, self.BACKOFF_BASE_SEC * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _ack(self, row_id: int) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+
+    def referenced_digests(self) -> set[str]:
+        """Hash-urile de conținut de care mai au nevoie intrările netrimise (pentru GC)."""
+        digests = set()
+        with self._lock:
+            rows = self._db().execute("SELECT payload FROM outbox").fetchall()
+        for (payload_json,) in rows:
+            try:
+                payload = json.loads(payload_json)
+            except ValueError:
+                continue
+            for digest_field in self.DEDUP_FIELDS.values():
+                if payload.get(digest_field):
+                    digests.add(payload[digest_field])
+        return digests
+
+    def _acked(self, server: str, digests: list[str]) -> set[str]:
+        if not digests:
+            return set()
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT digest FROM acked_digests WHERE server = ? AND digest IN (%s)"
+                % ",".join("?" * len(digests)),
+                (server, *digests),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def _mark_acked(self, server: str, digests: set[str]) -> None:
+        if not digests:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO acked_digests (server, digest, acked_at) VALUES (?, ?, ?)",
+                [(server, d, now) for d in digests],
+            )
+            db.execute(
+                "DELETE FROM acked_digests WHERE rowid NOT IN "
+                "(SELECT rowid FROM acked_digests ORDER BY acked_at DESC LIMIT ?)",
+                (self.MAX_ACKED_DIGESTS,),
+            )
+
+    def _forget_acked(self, server: str, digests: set[str]) -> None:
+        with self._lock:
+            self._db().executemany(
+                "DELETE FROM acked_digests WHERE server = ? AND digest = ?",
+                [(server, d) for d in digests],
+            )
+
+    def _server_format(self, server: str) -> str | None:
+        """"extended" / "legacy" / None (încă necunoscut sau de re-verificat)."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT format, checked_at FROM server_format WHERE server = ?", (server,)
+            ).fetchone()
+        if row is None:
+            return None
+        fmt, checked_at = row
+        if fmt == "legacy" and time.time() - checked_at > self.LEGACY_RECHECK_SEC:
+            return None
+        return fmt
+
+    def _set_server_format(self, server: str, fmt: str) -> None:
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO server_format (server, format, checked_at) VALUES (?, ?, ?)",
+                (server, fmt, time.time()),
+            )
+
+    def _legacy_payload(self, payload: dict, server: str) -> dict:
+        """Formatul vechi: conținut complet, fără digest-uri și câmpuri noi."""
+        out, _, _ = self._expand(payload, server, force_full=True)
+        for field in (*self.DEDUP_FIELDS.values(), *self.EXTENSION_FIELDS):
+            out.pop(field, None)
+        return out
+
+    def _expand(self, payload: dict, server: str, force_full: bool = False):
+        """
+        Construiește payload-ul de trimis: pentru fiecare digest, adaugă
+        conținutul complet doar dacă serverul nu l-a confirmat încă.
+        Întoarce (payload, digest-uri trimise complet, digest-uri trimise doar ca hash).
+        """
+        out = dict(payload)
+        digests = [out[f] for f in self.DEDUP_FIELDS.values() if out.get(f)]
+        known = set() if force_full else self._acked(server, digests)
+        sent_full, sent_digest_only = set(), set()
+        for field, digest_field in self.DEDUP_FIELDS.items():
+            digest = out.get(digest_field)
+            if not digest or field in out:
+                continue
+            if digest in known:
+                sent_digest_only.add(digest)
+                continue
+            content = CONTENT_STORE.get(digest)
+            if content is None:
+                print(f"[OUTBOX] Conținutul pentru {field} lipsește local; trimit doar hash-ul.")
+                sent_digest_only.add(digest)
+                continue
+            out[field] = content
+            sent_full.add(digest)
+        return out, sent_full, sent_digest_only
+
+    def _rejects_new_fields(self, resp: dict) -> bool:
+        """400/422 care numește câmpurile noi (sau "câmp necunoscut") – nu orice 4xx."""
+        if resp.get("_http") not in (400, 422):
+            return False
+        err = json.dumps(
+            {k: v for k, v in resp.items() if k != "_http"}, ensure_ascii=False
+        ).lower()
+        names = (*self.DEDUP_FIELDS.values(), *self.EXTENSION_FIELDS)
+        hints = ("unknown field", "unexpected field", "extra field", "not permitted",
+                 "additional properties", "câmp necunoscut")
+        return any(n in err for n in names) or any(h in err for h in hints)
+
+    @staticmethod
+    def _is_unknown_digest(resp: dict) -> bool:
+        err = str(resp.get("error") or "").lower()
+        return resp.get("_http") in (409, 422) or "digest" in err
+
+    def _send(self, endpoint: str, payload: dict) -> dict:
+        server = CONFIG.get("server_url", API_URL).rstrip("/")
+        server_format = self._server_format(server)
+        if server_format == "legacy":
+            return api_post(endpoint, self._legacy_payload(payload, server))
+
+        out, sent_full, sent_digest_only = self._expand(payload, server)
+        resp = api_post(endpoint, out)
+        if sent_digest_only and self._is_unknown_digest(resp):
+            # serverul nu (mai) are conținutul -> îl uităm și trimitem complet
+            print("[OUTBOX] Serverul nu recunoaște digest-ul, retrimit conținutul complet.")
+            self._forget_acked(server, sent_digest_only)
+            out, sent_full, _ = self._expand(payload, server, force_full=True)
+            resp = api_post(endpoint, out)
+        if server_format is None and self._rejects_new_fields(resp):
+            # primul contact: serverul nu știe câmpurile noi
+            print("[OUTBOX] Serverul respinge formatul nou, retrimit în formatul vechi.")
+            legacy_resp = api_post(endpoint, self._legacy_payload(payload, server))
+            if not legacy_resp.get("error"):
+                self._set_server_format(server, "legacy")
+            return legacy_resp
+        if not resp.get("error"):
+            if server_format is None:
+                self._set_server_format(server, "extended")
+            # doar digest-urile pe care serverul spune explicit că le-a păstrat
+            confirmed = resp.get("acked_digests")
+            if isinstance(confirmed, list):
+                self._mark_acked(server, sent_full & {d for d in confirmed if isinstance(d, str)})
+        return resp
+
+    def flush_once(self) -> float | None:
+        """
+        Trimite până la BATCH_SIZE intrări (câte un request fiecare). Întoarce peste câte secunde să încercăm din nou
+        (0 = mai sunt intrări gata de trimis, None = coada e goală).
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            # retenție: nu ținem la infinit telemetrie veche / în exces
+            db.execute("DELETE FROM outbox WHERE created_at < ?", (now - self.MAX_AGE_SEC,))
+            db.execute(
+                "DELETE FROM outbox WHERE id NOT IN "
+                "(SELECT id FROM outbox ORDER BY id DESC LIMIT ?)",
+                (self.MAX_ROWS,),
+            )
+            rows = db.execute(
+                "SELECT id, endpoint, payload, attempts FROM outbox "
+                "WHERE next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (now, self.BATCH_SIZE),
+            ).fetchall()
+
+        for row_id, endpoint, payload_json, attempts in rows:
+            try:
+                payload = json.loads(payload_json)
+            except ValueError:
+                self._ack(row_id)
+                continue
+            resp = self._send(endpoint, payload)
+            if is_transient_api_error(resp):
+                attempts += 1
+                delay = self._backoff(attempts)
+                with self._lock:
+                    self._db().execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                        (attempts, time.time() + delay, row_id),
+                    )
+                print(f"[OUTBOX] {endpoint} eșuat ({resp.get('error')}), reîncerc în {delay:.0f}s")
+                return delay
+            if resp.get("error"):
+                # răspuns definitiv (4xx): reîncercarea n-ar ajuta, renunțăm la intrare
+                print(f"[OUTBOX] {endpoint} respins definitiv:", resp.get("error"))
+            self._ack(row_id)
+
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT MIN(next_attempt_at), COUNT(*) FROM outbox").fetchone()
+            if not row[1]:
+                self._maybe_vacuum(db)
+                return None
+        return max(0.0, row[0] - time.time())
+
+    def _maybe_vacuum(self, db) -> None:
+        try:
+            page_count = db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = db.execute("PRAGMA page_size").fetchone()[0]
+            if page_count * page_size >= self.VACUUM_MIN_BYTES:
+                db.execute("VACUUM")
+        except Exception as e:
+            print("[OUTBOX] Compactare eșuată:", e)
+
+    def _run(self):
+        while True:
+            # resetăm înainte de flush: un enqueue din timpul flush-ului ne trezește imediat
+            self._wake.clear()
+            try:
+                delay = self.flush_once()
+            except Exception as e:
+                print("[OUTBOX] Eroare la trimitere:", e)
+                delay = self.BACKOFF_BASE_SEC
+            if delay == 0:
+                continue
+            self._wake.wait(delay)
+
+
+RUN_OUTBOX = RunOutbox(OUTBOX_FILE)
+
+
+# ================== OPRIRE RULARE ==================
+
+class RunCancelled(BaseException):
+    """
+    Rularea a fost oprită la cererea utilizatorului. Derivă din
+    BaseException (ca KeyboardInterrupt) ca să treacă de blocurile
+    `except Exception` din fluxul de postare și să ajungă direct la
+    run_posting; blocurile `finally` rulează în continuare.
+    """
+
+
+class CancelToken:
+    """
+    Semnalul de oprire al unei rulări, verificat de fiecare așteptare din
+    pipeline (locator, condiții JS, delay-ul dintre grupuri), astfel încât
+    "Oprește postările" are efect în cel mult ~o secundă.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise RunCancelled()
+
+    def wait(self, seconds: float) -> bool:
+        """Așteaptă `seconds`; True dacă între timp s-a cerut oprirea."""
+        return self._event.wait(max(seconds, 0))
+
+
+# ================== SELENIUM / CHROMEDRIVER ==================
+
+def get_chromedriver_path() -> str:
+    """
+    Caută chromedriver.exe:
+    - în același folder cu executabilul (Facepost.exe) / în bundle
+    - în rădăcina instalării versionate (comună tuturor versiunilor)
+    - apoi în current working directory
+    """
+    folders = []
+    if getattr(sys, "frozen", False):
+        folders.append(Path(sys.executable).parent)
+    folders.append(Path(getattr(sys, "_MEIPASS", Path.cwd())))
+    root = install_root()
+    if root is not None:
+        folders.append(root)
+    for folder in folders:
+        candidate = folder / CHROMEDRIVER_NAME
+        if candidate.exists():
+            return str(candidate)
+    candidate = Path.cwd() / CHROMEDRIVER_NAME
+    return str(candidate)
+
+
+def create_driver() -> webdriver.Chrome:
+    """Pornește Chrome cu profilul dedicat Facepost."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    chrome_opts = webdriver.ChromeOptions()
+    profile_dir = CONFIG.get("chrome_profile_dir")
+    if profile_dir:
+        chrome_opts.add_argument(f"--user-data-dir={profile_dir}")
+    chrome_opts.add_argument("--disable-notifications")
+    chrome_opts.add_argument("--disable-infobars")
+    chrome_opts.add_argument("--start-maximized")
+
+    service = Service(get_chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=chrome_opts)
+    driver.set_script_timeout(DRIVER_SCRIPT_TIMEOUT)
+    return driver
+
+
+class LoginWindowOpen(Exception):
+    """Fereastra de login Facebook ține profilul Chrome ocupat; rularea nu poate porni."""
+
+
+def login_window_open() -> bool:
+    """True cât fereastra Chrome de login (LOGIN_DRIVER) e încă deschisă."""
+    global LOGIN_DRIVER
+    driver = LOGIN_DRIVER
+    if driver is None:
+        return False
+    try:
+        driver.window_handles
+        return True
+    except Exception:
+        # userul a închis Chrome -> oprim și chromedriver-ul rămas
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if LOGIN_DRIVER is driver:
+            LOGIN_DRIVER = None
+        return False
+
+
+class DriverSession:
+    """
+    Un singur Chrome (profilul Facepost) păstrat deschis între rulări, ca
+    run-urile dese (interval / scheduler) să nu plătească de fiecare dată
+    pornirea Chrome + chromedriver și încărcarea Facebook.
+
+    - acquire(): driverul curent dacă răspunde la un ping ieftin
+      (execute_script), altfel îl recreează; se poate chema și în timpul
+      rulării (ex. între grupuri) ca să prindem un Chrome căzut
+    - release(): rularea s-a terminat; pagina e curățată, iar după
+      `chrome_keep_alive_minutes` fără folosire Chrome se închide
+    - close(): închidere imediată (login manual, ieșire din aplicație)
+
+    Un --user-data-dir poate fi folosit de un singur Chrome, deci sesiunea
+    și LOGIN_DRIVER nu pot fi deschise simultan: login-ul închide sesiunea
+    (doar când nu rulează nimic), iar acquire() refuză (LoginWindowOpen)
+    cât timp fereastra de login e deschisă – nu o închidem sub user.
+    Un singur thread folosește driverul la un moment dat (ex. pre-warm-ul
+    scheduler-ului vs. o rulare manuală); ceilalți așteaptă release().
+    """
+
+    def __init__(self):
+        self._lock = threading.Condition(threading.RLock())
+        self._driver: webdriver.Chrome | None = None
+        self._profile: str | None = None
+        self._in_use = False
+        self._owner: threading.Thread | None = None
+        self._last_used = 0.0
+        self._timer: threading.Timer | None = None
+        self.last_launch_sec: float | None = None  # durata ultimei porniri Chrome
+
+    @staticmethod
+    def _alive(driver: webdriver.Chrome) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._driver is not None
+
+    def acquire(self, cancel: CancelToken | None = None) -> webdriver.Chrome:
+        """
+        Driver viu, pe profilul din config (îl pornește / recreează la nevoie).
+        LoginWindowOpen dacă trebuie pornit Chrome, dar fereastra de login e deschisă.
+        """
+        with self._lock:
+            while self._in_use and self._owner is not threading.current_thread():
+                self._lock.wait()
+            self._cancel_timer()
+            profile = CONFIG.get("chrome_profile_dir") or ""
+            if self._driver is not None:
+                if profile != self._profile:
+                    print("[DRIVER] S-a schimbat profilul Chrome, repornesc sesiunea.")
+                    self._quit()
+                elif not self._alive(self._driver):
+                    print("[DRIVER] Chrome nu mai răspunde, repornesc sesiunea.")
+                    self._quit()
+
+            if self._driver is None:
+                if login_window_open():
+                    # fereastra de login ține profilul blocat; userul încă lucrează în ea
+                    raise LoginWindowOpen("fereastra de login Facebook este încă deschisă")
+                t = time.monotonic()
+                driver = create_driver()
+                try:
+                    driver.get("https://www.facebook.com/")
+                    wait_for_facebook_home(driver, timeout=60, cancel=cancel)
+                except BaseException:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                    raise
+                self.last_launch_sec = time.monotonic() - t
+                print(f"[DRIVER] Chrome pornit în {self.last_launch_sec:.1f}s")
+                record_chrome_launch(self.last_launch_sec)
+                self._driver = driver
+                self._profile = profile
+
+            self._in_use = True
+            self._owner = threading.current_thread()
+            return self._driver
+
+    def release(self, hold_sec: float = 0.0, reset_page: bool = True) -> None:
+        """
+        Sfârșitul unei rulări: lăsăm pagina curată și programăm închiderea la
+        inactivitate (cel puțin `hold_sec`, ex. până la o rundă pre-încălzită).
+        """
+        with self._lock:
+            self._in_use = False
+            self._owner = None
+            self._last_used = time.monotonic()
+            self._lock.notify_all()
+            if self._driver is None:
+                return
+            if reset_page:
+                try:
+                    leave_page_clean(self._driver)
+                except Exception:
+                    self._quit()
+                    return
+
+            idle = max(float(CONFIG.get("chrome_keep_alive_minutes", 20) or 0) * 60, hold_sec)
+            if idle <= 0:
+                self._quit()
+                return
+            self._timer = threading.Timer(idle, self._evict_if_idle, args=(idle,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def close(self, wait: bool = False) -> None:
+        """Închide Chrome; cu `wait` așteaptă întâi ca rularea curentă să elibereze driverul."""
+        with self._lock:
+            while wait and self._in_use:
+                self._lock.wait()
+            self._cancel_timer()
+            self._in_use = False
+            self._owner = None
+            self._lock.notify_all()
+            self._quit()
+
+    def _evict_if_idle(self, idle: float) -> None:
+        with self._lock:
+            if self._in_use or self._driver is None:
+                return
+            if time.monotonic() - self._last_used < idle - 1:
+                return
+            print(f"[DRIVER] Chrome nefolosit de {idle / 60:.0f} min, îl închid.")
+            self._quit()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _quit(self) -> None:
+        driver, self._driver = self._driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
 
+DRIVER_SESSION = DriverSession()
 
-def check_license(email: str, fingerprint: str) -> dict:
-    """Verifică licența pentru device: POST /check"""
-    return api_post("/check", {"email": email, "fingerprint": fingerprint})
+# neutralizează promptul "Părăsiți site-ul?" (Facebook îl cere cât composer-ul are text)
+JS_DISARM_BEFOREUNLOAD = """
+window.onbeforeunload = null;
+window.addEventListener('beforeunload', function (e) {
+  e.stopImmediatePropagation();
+  delete e.returnValue;
+}, true);
+"""
 
 
-def log_run(groups, text: str, images):
+def leave_page_clean(driver: webdriver.Chrome) -> None:
     """
-    Trimite către server un log simplu pentru fiecare RUN:
-    - email, fingerprint, group_urls, post_text, images_count
+    Lasă browserul pe about:blank, fără composer deschis și fără dialog
+    beforeunload blocat (după o rulare sau o oprire în mijlocul postării).
     """
-    email = (CONFIG.get("email") or "").strip().lower()
-    fingerprint = CONFIG.get("device_id") or ""
-    if not email:
-        return {"error": "no email in config"}
+    try:
+        driver.execute_script(JS_DISARM_BEFOREUNLOAD)
+    except Exception:
+        pass
+    try:
+        driver.get("about:blank")
+    except Exception:
+        # dialogul a apărut totuși: îl acceptăm și reîncercăm
+        try:
+            driver.switch_to.alert.accept()
+        except Exception:
+            pass
+        driver.get("about:blank")
 
-    group_urls = "\n".join([g.strip() for g in (groups or []) if g.strip()])
+CHROME_LAUNCH_HISTORY_LEN = 10
+CHROME_PREWARM_DEFAULT_SEC = 180
+CHROME_PREWARM_MIN_SEC = 60
+CHROME_PREWARM_MAX_SEC = 900
 
-    payload = {
-        "email": email,
-        "fingerprint": fingerprint,
-        "group_urls": group_urls,
-        "post_text": text or "",
-        "images_count": len(images or []),
-    }
-    return api_post("/log_run", payload)
 
+def record_chrome_launch(seconds: float) -> None:
+    """Păstrează ultimele durate de pornire Chrome + Facebook (pentru avansul de pre-warm)."""
+    history = list(CONFIG.get("chrome_launch_history") or [])
+    history.append(round(seconds, 1))
+    CONFIG["chrome_launch_history"] = history[-CHROME_LAUNCH_HISTORY_LEN:]
+    save_config(CONFIG)
 
-# ================== SELENIUM / CHROMEDRIVER ==================
 
-def get_chromedriver_path() -> str:
+def chrome_prewarm_lead_sec(cfg: dict) -> float:
     """
-    Caută chromedriver.exe:
-    - în același folder cu executabilul (Facepost.exe)
-    - apoi în current working directory
+    Cu cât timp înaintea unei runde zilnice pornim Chrome: valoarea din
+    config dacă e setată, altfel învățată din pornirile recente (cea mai
+    lentă, cu marjă pentru încărcarea Facebook și verificarea login-ului).
     """
-    exe_dir = Path(getattr(sys, "_MEIPASS", Path.cwd()))
-    candidate = exe_dir / CHROMEDRIVER_NAME
-    if candidate.exists():
-        return str(candidate)
-    candidate = Path.cwd() / CHROMEDRIVER_NAME
-    return str(candidate)
-
+    try:
+        configured = float(cfg.get("chrome_prewarm_lead_sec") or 0)
+    except (TypeError, ValueError):
+        configured = 0
+    if configured > 0:
+        return configured
+    history = [float(x) for x in cfg.get("chrome_launch_history") or []]
+    if not history:
+        return CHROME_PREWARM_DEFAULT_SEC
+    learned = max(history) * 2 + 45
+    return min(max(learned, CHROME_PREWARM_MIN_SEC), CHROME_PREWARM_MAX_SEC)
+
+
+def facebook_logged_in(driver: webdriver.Chrome) -> bool:
+    """Heuristic: pagina de Facebook încărcată NU e formularul de login / checkpoint."""
+    url = driver.current_url or ""
+    if "/login" in url or "/checkpoint" in url:
+        return False
+    return not driver.execute_script(
+        "return !!document.querySelector('input[name=\"email\"], input[name=\"pass\"]');"
+    )
 
-def create_driver() -> webdriver.Chrome:
-    """Pornește Chrome cu profilul dedicat Facepost."""
-    chrome_opts = webdriver.ChromeOptions()
-    profile_dir = CONFIG.get("chrome_profile_dir")
-    if profile_dir:
-        chrome_opts.add_argument(f"--user-data-dir={profile_dir}")
-    chrome_opts.add_argument("--disable-notifications")
-    chrome_opts.add_argument("--disable-infobars")
-    chrome_opts.add_argument("--start-maximized")
 
-    service = Service(get_chromedriver_path())
-    driver = webdriver.Chrome(service=service, options=chrome_opts)
-    return driver
+def prewarm_chrome(hold_sec: float) -> tuple[bool, str]:
+    """
+    Pornește (sau verifică) sesiunea Chrome, încarcă Facebook și verifică
+    login-ul. Sesiunea rămâne deschisă cel puțin `hold_sec`.
+    return: (ok, mesaj de eroare pentru user)
+    """
+    try:
+        driver = DRIVER_SESSION.acquire()
+    except LoginWindowOpen:
+        return False, "fereastra de login Facebook este deschisă – închide-o înainte de rundă."
+    except Exception as e:
+        return False, f"Chrome nu a putut fi pornit: {e}"
+    try:
+        if "facebook.com" not in (driver.current_url or ""):
+            driver.get("https://www.facebook.com/")
+        if not wait_for_facebook_home(driver, timeout=60):
+            return False, "Facebook nu s-a încărcat în 60s."
+        if not facebook_logged_in(driver):
+            return False, "Facebook nu este logat în profilul Chrome Facepost."
+        return True, ""
+    except Exception as e:
+        return False, f"Facebook nu s-a încărcat: {e}"
+    finally:
+        # lăsăm Facebook deschis – runda pornește direct de pe el
+        DRIVER_SESSION.release(hold_sec=hold_sec, reset_page=False)
 
 
 # ================== CONFIGURARE LOGIN FACEBOOK ==================
@@ -219,6 +1710,7 @@ def configure_facebook_login(
       - "switch" -> schimbarea profilului de Facebook (delogare + relogare)
     """
     global LOGIN_DRIVER
+    from selenium.common.exceptions import WebDriverException
 
     if mode == "switch":
         instr = (
@@ -246,6 +1738,9 @@ def configure_facebook_login(
         parent=parent,
     )
 
+    # Sesiunea de postare ține profilul Chrome blocat; apelantul o închide
+    # înainte (FacepostApp._open_facebook_login), în afara thread-ului Tk.
+
     # Dacă aveam deja un driver de login deschis, încercăm să îl închidem curat
     if LOGIN_DRIVER is not None:
         try:
@@ -289,28 +1784,394 @@ def configure_facebook_login(
     # NU mai afișăm alt mesaj aici; userul lucrează liniștit în Chrome,
     # se loghează (sau schimbă profilul) și când termină închide fereastra de Chrome.
 
-def wait_for_facebook_home(driver: webdriver.Chrome, timeout: int = 60):
-    WebDriverWait(driver, timeout).until(
-        EC.presence_of_element_located((By.TAG_NAME, "body"))
-    )
+def wait_for_facebook_home(
+    driver: webdriver.Chrome, timeout: int = 60, cancel: CancelToken | None = None
+) -> bool:
+    """
+    Așteaptă ca pagina Facebook să fie utilizabilă: readyState trecut de
+    'loading' și conținutul principal (role=main / feed) sau formularul de
+    login randat. False dacă nu se întâmplă până la deadline (apelantul continuă).
+    """
+    if wait_until_js(driver, JS_FACEBOOK_READY, timeout, poll=0.2, cancel=cancel):
+        return True
+    print(f"[WARN] Pagina Facebook nu e gata după {timeout}s (readyState/main/feed); continui.")
+    return False
 
 
-# ================== LOGICA DE POSTARE ==================
-def set_clipboard_text_windows(text: str, retries: int = 30, delay: float = 0.05) -> bool:
+# ================== CLASAMENT SELECTORI ==================
+
+class SelectorStats:
     """
-    Setează clipboard-ul Windows cu text Unicode (emoji + newline inclus).
-    Variantă stabilă pe x64 (ctypes prototypes setate).
+    Ține minte ce XPATH-uri funcționează pe Facebook-ul userului, ca la
+    următoarea postare să încercăm întâi câștigătorul (cu timeout normal),
+    iar restul candidaților doar cu un timeout scurt.
+
+    - tabelul e per limbă (<html lang>) și, opțional, per grup
+      (selector_stats_per_group), separat pe etape: composer / textbox / post_button
+    - scor = (hits + 1) / (hits + misses + 2); candidații noi pornesc de la 0.5
+    - la fiecare observație contoarele vechi se înmulțesc cu DECAY, deci
+      după o schimbare de DOM câștigătorul vechi coboară în câteva postări
+    - salvat pe disc cu ConfigPersister (scriere comasată, atomică)
     """
-    if text is None:
-        text = ""
 
-    CF_UNICODETEXT = 13
-    GMEM_MOVEABLE = 0x0002
+    DECAY = 0.9
+    MIN_WEIGHT = 0.05  # sub atât, intrarea se uită
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._table: dict | None = None
+        self._persister = ConfigPersister(path, serialize=self._dump, delay=2.0, max_delay=10.0)
+
+    def _load(self) -> dict:
+        if self._table is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._table = json.load(f)
+            except FileNotFoundError:
+                self._table = {}
+            except Exception as e:
+                print("[SELECTORS] Statistici ilizibile, pornesc de la zero:", e)
+                self._table = {}
+        return self._table
+
+    def _dump(self, _snapshot: dict) -> str:
+        with self._lock:
+            return json.dumps(self._load(), ensure_ascii=False, indent=1)
+
+    def flush(self) -> None:
+        self._persister.flush()
+
+    @staticmethod
+    def scopes(locale: str, group_url: str | None = None) -> list[str]:
+        """Cheile de tabel pentru o postare, de la cea mai specifică la cea generală."""
+        locale = (locale or "?").lower().split("-")[0]
+        keys = [locale]
+        if group_url and CONFIG.get("selector_stats_per_group"):
+            group = group_url.split("?")[0].rstrip("/").split("facebook.com/")[-1]
+            keys.insert(0, f"{locale}|{group}")
+        return keys
+
+    @staticmethod
+    def _score(entry: dict) -> float:
+        return (entry.get("hits", 0) + 1) / (entry.get("hits", 0) + entry.get("misses", 0) + 2)
+
+    def order(self, stage: str, candidates: list[str], scopes: list[str]) -> list[str]:
+        """Candidații în ordinea încercării: ultimul câștigător, apoi după scor (la egalitate, ordinea din cod)."""
+        with self._lock:
+            table = self._load()
+            for scope in scopes:
+                stats = table.get(scope, {}).get(stage)
+                if not stats:
+                    continue
+                entries = stats.get("selectors", {})
+                winner = stats.get("winner")
+                index = {xp: i for i, xp in enumerate(candidates)}
+                return sorted(
+                    candidates,
+                    key=lambda xp: (
+                        xp != winner,
+                        -self._score(entries.get(xp, {})),
+                        index[xp],
+                    ),
+                )
+        return list(candidates)
+
+    def record(self, stage: str, winner: str | None, missed: list[str], scopes: list[str]) -> None:
+        """Notează rezultatul unei căutări: `missed` au expirat, `winner` a funcționat (sau None)."""
+        now = datetime.now(UTC).isoformat(timespec="seconds")
+        with self._lock:
+            table = self._load()
+            for scope in scopes:
+                stats = table.setdefault(scope, {}).setdefault(stage, {"selectors": {}})
+                entries = stats["selectors"]
+                for xp in list(entries):
+                    entry = entries[xp]
+                    entry["hits"] = round(entry.get("hits", 0) * self.DECAY, 3)
+                    entry["misses"] = round(entry.get("misses", 0) * self.DECAY, 3)
+                    if entry["hits"] + entry["misses"] < self.MIN_WEIGHT:
+                        del entries[xp]
+                for xp in missed:
+                    entries.setdefault(xp, {})["misses"] = entries.get(xp, {}).get("misses", 0) + 1
+                if winner is not None:
+                    entry = entries.setdefault(winner, {})
+                    entry["hits"] = entry.get("hits", 0) + 1
+                    entry["last_hit"] = now
+                if winner is not None or stats.get("winner") in missed:
+                    stats["winner"] = winner
+            self._persister.schedule(table)
+
+    def report(self) -> str:
+        """Text lizibil: pentru fiecare limbă/grup și etapă, selectorii cu scor și ultima reușită."""
+        with self._lock:
+            table = self._load()
+            if not table:
+                return "Nu există încă statistici de selectori (se adună la postări)."
+            lines = []
+            for scope in sorted(table):
+                for stage in sorted(table[scope]):
+                    stats = table[scope][stage]
+                    lines.append(f"[{scope}] {stage}")
+                    entries = stats.get("selectors", {})
+                    for xp in sorted(entries, key=lambda x: -self._score(entries[x])):
+                        entry = entries[xp]
+                        mark = "*" if xp == stats.get("winner") else " "
+                        lines.append(
+                            f" {mark} {self._score(entry):4.0%}  "
+                            f"hit {entry.get('hits', 0):4.1f} / miss {entry.get('misses', 0):4.1f}  "
+                            f"{entry.get('last_hit', '-'):25}  {' '.join(xp.split())}"
+                        )
+                    lines.append("")
+            return "\n".join(lines)
+
+
+SELECTOR_STATS = SelectorStats(SELECTOR_STATS_FILE)
+atexit.register(SELECTOR_STATS.flush)
+
+SELECTOR_FIRST_TIMEOUT = 10   # sec, pentru candidatul cel mai probabil
+SELECTOR_RETRY_TIMEOUT = 2    # sec, pentru ceilalți (pagina e deja încărcată)
+SELECTOR_PRIORITY_WINDOW = 1.5  # sec în care doar candidatul cel mai probabil poate câștiga
+
+
+def page_locale(driver: webdriver.Chrome) -> str:
+    try:
+        return driver.execute_script(
+            "return document.documentElement.lang || navigator.language || '';"
+        ) or "?"
+    except Exception:
+        return "?"
+
+
+# ================== LOCATOR JS ==================
+
+# Evaluează în pagină lista ordonată de XPATH-uri și întoarce [element, index]
+# pentru primul candidat utilizabil (vizibil + activ, dacă se cere). Dacă nu
+# există încă, așteaptă în pagină (MutationObserver + verificare periodică
+# pentru schimbări doar de CSS) până la deadline – un singur round-trip
+# WebDriver în loc de câte o buclă WebDriverWait per candidat.
+JS_LOCATE = """
+var xpaths = arguments[0], timeoutMs = arguments[1], needUsable = arguments[2];
+var done = arguments[arguments.length - 1];
+
+function usable(el) {
+  if (!needUsable) return true;
+  if (el.disabled || el.getAttribute('aria-disabled') === 'true') return false;
+  var r = el.getBoundingClientRect();
+  if (r.width === 0 || r.height === 0) return false;
+  var st = window.getComputedStyle(el);
+  return st.visibility !== 'hidden' && st.display !== 'none';
+}
+
+function find() {
+  for (var i = 0; i < xpaths.length; i++) {
+    var res;
+    try {
+      res = document.evaluate(xpaths[i], document, null,
+                              XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+      continue;
+    }
+    for (var j = 0; j < res.snapshotLength; j++) {
+      var el = res.snapshotItem(j);
+      if (usable(el)) return [el, i];
+    }
+  }
+  return null;
+}
+
+var hit = find();
+if (hit || timeoutMs <= 0) { done(hit); return; }
+
+var finished = false, scheduled = false, observer, timer, poll;
+function finish(value) {
+  if (finished) return;
+  finished = true;
+  observer.disconnect();
+  clearTimeout(timer);
+  clearInterval(poll);
+  done(value);
+}
+function check() {
+  scheduled = false;
+  var h = find();
+  if (h) finish(h);
+}
+observer = new MutationObserver(function () {
+  // Facebook modifică DOM-ul foarte des: comasăm verificările
+  if (!scheduled) { scheduled = true; setTimeout(check, 50); }
+});
+observer.observe(document.documentElement, {
+  childList: true, subtree: true, attributes: true,
+  attributeFilter: ['style', 'class', 'hidden', 'disabled', 'aria-disabled']
+});
+poll = setInterval(check, 250);
+timer = setTimeout(function () { finish(find()); }, timeoutMs);
+"""
+
+DRIVER_SCRIPT_TIMEOUT = 90  # sec; limita pentru execute_async_script (locatorul are deadline propriu)
+
+
+CANCEL_CHECK_SEC = 1.0  # cât de des verifică așteptările lungi semnalul de oprire
+
+
+def js_locate(
+    driver: webdriver.Chrome,
+    xpaths: list[str],
+    timeout: float,
+    usable: bool = True,
+    cancel: CancelToken | None = None,
+):
+    """
+    (element, index) pentru primul XPATH din `xpaths` cu un element
+    utilizabil (vizibil + activ; sau doar prezent dacă usable=False),
+    așteptând în pagină cel mult `timeout` secunde. (None, None) dacă nu
+    apare. Erorile WebDriver (ex. navigare în timpul scriptului) se propagă.
+    Cu `cancel`, așteptarea din pagină e tăiată în felii de CANCEL_CHECK_SEC.
+    """
+    deadline = time.monotonic() + min(max(timeout, 0), DRIVER_SCRIPT_TIMEOUT - 5)
+    while True:
+        if cancel is not None:
+            cancel.check()
+        remaining = max(deadline - time.monotonic(), 0)
+        if cancel is not None:
+            remaining = min(remaining, CANCEL_CHECK_SEC)
+        res = driver.execute_async_script(JS_LOCATE, list(xpaths), int(remaining * 1000), usable)
+        if res:
+            return res[0], int(res[1])
+        if time.monotonic() >= deadline:
+            return None, None
+
+
+def wait_until_js(
+    driver: webdriver.Chrome,
+    js: str,
+    timeout: float,
+    *args,
+    poll: float = 0.1,
+    cancel: CancelToken | None = None,
+) -> bool:
+    """
+    Așteaptă (cel mult `timeout` sec) ca expresia JS `js` (cu `return`) să
+    devină adevărată. Întoarce False la deadline (sau la o eroare JS) în loc
+    să arunce – fiecare apelant decide fallback-ul. Oprirea (`cancel`)
+    aruncă RunCancelled.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if cancel is not None:
+            cancel.check()
+        try:
+            if driver.execute_script(js, *args):
+                return True
+        except Exception:
+            return False
+        if time.monotonic() >= deadline:
+            return False
+        if cancel is not None:
+            cancel.wait(poll)
+        else:
+            time.sleep(poll)
+
+
+# pagina Facebook e utilizabilă: DOM gata + conținutul principal (sau formularul de login)
+JS_FACEBOOK_READY = """
+return document.readyState !== 'loading' &&
+  !!document.querySelector('[role="main"], [role="feed"], input[name="pass"]');
+"""
+
+# numărul de previzualizări de imagini din composer; cu argument: sunt cel puțin atâtea?
+JS_UPLOAD_PREVIEWS = """
+var scope = document.querySelector('[role="dialog"]') || document;
+var n = scope.querySelectorAll('img[src^="blob:"]').length;
+return arguments.length ? n >= arguments[0] : n;
+"""
+
+# previzualizările au fost scoase: cel mult atâtea au rămas
+JS_PREVIEWS_AT_MOST = """
+var scope = document.querySelector('[role="dialog"]') || document;
+return scope.querySelectorAll('img[src^="blob:"]').length <= arguments[0];
+"""
+
+# scoate previzualizările de imagini din composer (butonul "Elimină"/"Remove"
+# din colțul fiecărei imagini); întoarce câte butoane a apăsat
+JS_CLEAR_PREVIEWS = """
+var scope = document.querySelector('[role="dialog"]') || document;
+var imgs = scope.querySelectorAll('img[src^="blob:"]'), clicked = 0;
+var label = /elimin|remove|șterge|sterge|delete/i;
+for (var i = 0; i < imgs.length; i++) {
+  var node = imgs[i].parentElement;
+  for (var depth = 0; node && depth < 6; depth++, node = node.parentElement) {
+    var btns = node.querySelectorAll('[role="button"][aria-label], button[aria-label]');
+    var hit = null;
+    for (var j = 0; j < btns.length; j++) {
+      if (label.test(btns[j].getAttribute('aria-label'))) { hit = btns[j]; break; }
+    }
+    if (hit) { hit.click(); clicked++; break; }
+  }
+}
+return clicked;
+"""
+
+# marchează composer-ul (dialogul / formularul) în care e butonul de postare,
+# ca JS_POST_SUBMITTED să-l poată urmări fără referințe care devin "stale"
+JS_MARK_COMPOSER = """
+var c = arguments[0].closest('[role="dialog"]') || arguments[0].closest('form');
+if (!c) return false;
+c.setAttribute('data-facepost-composer', arguments[1]);
+return true;
+"""
+
+# mesaje de confirmare (toast) după publicare; niciodată doar "post" –
+# și erorile ("Post failed", "Postarea nu a putut fi publicată") îl conțin
+POST_CONFIRMATIONS = (
+    "your post is now published",
+    "your post was shared",
+    "your post is pending",
+    "postarea ta a fost publicată",
+    "postarea ta este acum publicată",
+    "postarea ta a fost distribuită",
+    "postarea ta așteaptă aprobarea",
+)
+
+# postarea a plecat: composer-ul marcat a dispărut (detașat / ascuns)
+# sau Facebook a afișat o confirmare explicită
+JS_POST_SUBMITTED = """
+var token = arguments[0], confirmations = arguments[1];
+if (token) {
+  var c = document.querySelector('[data-facepost-composer="' + token + '"]');
+  if (!c || c.getClientRects().length === 0) return true;
+}
+var notes = document.querySelectorAll('[role="alert"], [role="status"]');
+for (var i = 0; i < notes.length; i++) {
+  var t = (notes[i].innerText || '').toLowerCase();
+  for (var j = 0; j < confirmations.length; j++) {
+    if (t.indexOf(confirmations[j]) >= 0) return true;
+  }
+}
+return false;
+"""
+
+# fără composer de urmărit și fără confirmare: pauza fixă de dinainte
+POST_SETTLE_SEC = 3
+
+
+# ================== LOGICA DE POSTARE ==================
+
+_CLIPBOARD_API = None  # (user32, kernel32) cu prototypes setate o singură dată
+
+
+def _clipboard_api():
+    """user32 / kernel32 cu prototypes ctypes declarate (IMPORTANT pe x64), cache per proces."""
+    global _CLIPBOARD_API
+    if _CLIPBOARD_API is not None:
+        return _CLIPBOARD_API
+
+    import ctypes
+    from ctypes import wintypes
 
     user32 = ctypes.windll.user32
     kernel32 = ctypes.windll.kernel32
 
-    # --- prototypes (IMPORTANT pentru x64) ---
     user32.OpenClipboard.argtypes = [wintypes.HWND]
     user32.OpenClipboard.restype = wintypes.BOOL
 
@@ -334,9 +2195,30 @@ def set_clipboard_text_windows(text: str, retries: int = 30, delay: float = 0.05
 
     kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
     kernel32.GlobalFree.restype = wintypes.HGLOBAL
-    # ---------------------------------------
 
-    data = (text + "\x00").encode("utf-16-le")
+    _CLIPBOARD_API = (user32, kernel32)
+    return _CLIPBOARD_API
+
+
+def clipboard_buffer(text: str) -> bytes:
+    """Textul în formatul CF_UNICODETEXT (UTF-16-LE terminat cu NUL)."""
+    return ((text or "") + "\x00").encode("utf-16-le")
+
+
+def set_clipboard_text_windows(
+    text: str | bytes, retries: int = 30, delay: float = 0.05
+) -> bool:
+    """
+    Setează clipboard-ul Windows cu text Unicode (emoji + newline inclus).
+    Acceptă și buffer-ul deja codat (clipboard_buffer / PreparedPost.clipboard).
+    """
+    import ctypes
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+
+    user32, kernel32 = _clipboard_api()
+    data = text if isinstance(text, bytes) else clipboard_buffer(text)
 
     for _ in range(retries):
         try:
@@ -376,40 +2258,35 @@ def set_clipboard_text_windows(text: str, retries: int = 30, delay: float = 0.05
 
     return False
 
+
+_NON_BMP_RE = re.compile("[\U00010000-\U0010FFFF]")
+
+
 def sanitize_for_chromedriver(text: str) -> str:
     """
-    ChromeDriver nu suportă caractere în afara BMP (ex: unele emoji).
-    Filtrăm caracterele cu codepoint > 0xFFFF ca să nu arunce eroare.
+    ChromeDriver nu suportă caractere în afara BMP (ex: unele emoji) în send_keys.
+    Le eliminăm ca să nu arunce eroare.
     """
     if not text:
         return text
-    safe_chars = []
-    for ch in text:
-        if ord(ch) <= 0xFFFF:
-            safe_chars.append(ch)
-        else:
-            # caracterele problematice le aruncăm; poți pune în loc "?" dacă vrei
-            continue
-    return "".join(safe_chars)
+    return _NON_BMP_RE.sub("", text)
+
 
-def set_text_via_js(driver, element, text: str):
+def text_to_html(text: str) -> str:
+    """Text -> HTML pentru editorul Facebook: escapat, cu newline-urile ca <br>."""
+    normalized = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    return html.escape(normalized, quote=False).replace("\n", "<br>")
+
+
+def set_text_via_js(driver, element, text: str, html_text: str | None = None):
     js = r"""
 var container = arguments[0];
-var text = arguments[1];
+var html = arguments[1];
 if (!container) return;
 
 container.focus();
 var target = document.activeElement || container;
 
-// Convertim newline-urile în <br> ca să păstrăm structura
-var html = (text || "")
-  .replace(/&/g, "&amp;")
-  .replace(/</g, "&lt;")
-  .replace(/>/g, "&gt;")
-  .replace(/\r\n/g, "\n")
-  .replace(/\r/g, "\n")
-  .replace(/\n/g, "<br>");
-
 if (typeof document.execCommand === 'function') {
   try {
     target.focus();
@@ -430,13 +2307,57 @@ if (typeof document.execCommand === 'function') {
 var ev = new Event("input", {bubbles: true});
 target.dispatchEvent(ev);
 """
-    driver.execute_script(js, element, text)
+    driver.execute_script(js, element, html_text if html_text is not None else text_to_html(text))
+
+
+@dataclass(frozen=True)
+class PreparedPost:
+    """
+    Conținutul unei postări, pregătit o singură dată per rulare în
+    run_posting; fiecare grup doar îl consumă (fără re-codare / re-validare).
+    """
+
+    text: str
+    clipboard: bytes  # CF_UNICODETEXT, gata de pus în clipboard
+    safe_text: str  # fără caractere non-BMP, pentru send_keys
+    html: str  # pentru inserarea prin JS
+    images: tuple[tuple[str, int], ...]  # (cale absolută, mărime în bytes)
+
+    @classmethod
+    def build(cls, text: str, images) -> "PreparedPost":
+        text = text or ""
+        valid = []
+        for img in images or []:
+            path = os.path.abspath(img)
+            try:
+                valid.append((path, os.path.getsize(path)))
+            except OSError:
+                print("[WARN] Imagine inexistentă / inaccesibilă, o sar:", path)
+        return cls(
+            text=text,
+            clipboard=clipboard_buffer(text),
+            safe_text=sanitize_for_chromedriver(text),
+            html=text_to_html(text),
+            images=tuple(valid),
+        )
+
+    @property
+    def image_paths(self) -> list[str]:
+        return [path for path, _ in self.images]
+
+    @property
+    def upload_timeout(self) -> float:
+        """Deadline pentru previzualizări: 10s + 5s per imagine + ~2s per MB."""
+        total_mb = sum(size for _, size in self.images) / (1024 * 1024)
+        return 10 + 5 * len(self.images) + 2 * total_mb
+
 
 def open_group_and_post(driver: webdriver.Chrome,
                         group_url: str,
-                        text: str,
-                        images,
-                        simulate: bool = False) -> None:
+                        post: PreparedPost,
+                        simulate: bool = False,
+                        cancel: CancelToken | None = None,
+                        on_step=None) -> dict:
     """
     Deschide un link de grup și postează textul + imaginile.
 
@@ -446,36 +2367,182 @@ def open_group_and_post(driver: webdriver.Chrome,
        - texte RO/EN: "Scrie ceva", "Scrie acum", "Scrie o postare", "Create post", etc.
     3. Găsește textbox-ul din composer (nu din comentarii)
     4. Scrie textul, atașează imagini, apasă Postează.
+
+    Întoarce durata fiecărui pas (secunde), ex. {"navigate": 2.1, "composer": 0.4, ...}.
+    `on_step(pas)` e chemat la finalul fiecărui pas (pentru progres).
+    Toate așteptările verifică `cancel`; o oprire aruncă RunCancelled.
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+
+    scopes: list[str] = []
+    timings: dict[str, float] = {}
+    t_step = time.perf_counter()
+
+    def mark(step):
+        """Notează cât a durat pasul care tocmai s-a încheiat."""
+        nonlocal t_step
+        now = time.perf_counter()
+        timings[step] = round(now - t_step, 2)
+        t_step = now
+        if on_step is not None:
+            on_step(step)
+
+    def locate(stage, xpaths, first_timeout=SELECTOR_FIRST_TIMEOUT, usable=True):
+        """
+        (element, xpath) pentru primul candidat utilizabil, în ordinea din
+        SELECTOR_STATS (dacă `stage` e dat). Primul candidat are o fereastră
+        scurtă (SELECTOR_PRIORITY_WINDOW) doar pentru el – altfel un candidat
+        mai slab care apare primul în timpul încărcării ar câștiga; apoi un
+        singur apel js_locate pentru toată lista, în timpul rămas. Dacă
+        locatorul JS eșuează, revenim la WebDriverWait per candidat (primul
+        cu timeout normal, restul cu SELECTOR_RETRY_TIMEOUT).
+        """
+        ordered = SELECTOR_STATS.order(stage, xpaths, scopes) if stage else list(xpaths)
+        try:
+            deadline = time.monotonic() + first_timeout
+            el, idx = None, None
+            if len(ordered) > 1:
+                window = min(SELECTOR_PRIORITY_WINDOW, first_timeout)
+                el, idx = js_locate(driver, ordered[:1], window, usable=usable, cancel=cancel)
+            if el is None:
+                el, idx = js_locate(
+                    driver, ordered, max(deadline - time.monotonic(), 0),
+                    usable=usable, cancel=cancel,
+                )
+            xp = ordered[idx] if el is not None else None
+            missed = ordered[:idx] if el is not None else ordered
+        except Exception as e:
+            print(f"[DEBUG] Locator JS eșuat ({e.__class__.__name__}), revin la WebDriverWait.")
+            condition = EC.element_to_be_clickable if usable else EC.presence_of_element_located
+            el = xp = None
+            missed = []
+            for i, cand in enumerate(ordered):
+                found = condition((By.XPATH, cand))
+                try:
+                    el = WebDriverWait(
+                        driver, first_timeout if i == 0 else SELECTOR_RETRY_TIMEOUT
+                    ).until(lambda d: (cancel.check() if cancel else None) or found(d))
+                    xp = cand
+                    break
+                except Exception:
+                    missed.append(cand)
+        if stage:
+            SELECTOR_STATS.record(stage, xp, missed, scopes)
+        return el, xp
+
+    def click(el):
+        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
+        try:
+            el.click()
+        except Exception:
+            # fallback JS click dacă Selenium clasic e interceptat
+            driver.execute_script("arguments[0].click();", el)
+
+    def try_click_xpaths(xpaths, stage="composer", first_timeout=SELECTOR_FIRST_TIMEOUT):
+        """Găsește primul candidat clicabil (vezi locate) și dă click pe el."""
+        el, xp = locate(stage, xpaths, first_timeout)
+        if el is None:
+            return False
+        try:
+            click(el)
+        except Exception as e:
+            print(f"[WARN] {stage}: click eșuat pe {xp}:", e)
+            return False
+        print(f"[DEBUG] {stage} click cu XPATH: {xp}")
+        return True
+
+    # input <input type="file" accept="image/..."> (ascuns -> doar prezent, nu vizibil)
+    file_input_xpaths = ["//input[@type='file' and contains(@accept, 'image')]"]
+    photo_btn_xpaths = [
+        "//div[@role='button'][.//span[contains(text(),'Foto')] "
+        " or .//span[contains(text(),'Photo')]]"
+    ]
+
+    def insert_via_js(textbox):
+        """Inserare prin JS (HTML pregătit); ultimă variantă: tastare (text fără non-BMP)."""
+        try:
+            set_text_via_js(driver, textbox, post.text, post.html)
+        except Exception as e:
+            print("[WARN] Inserare prin JS eșuată, tastez textul:", e)
+            textbox.send_keys(post.safe_text)
+
+    def find_file_input():
+        file_input, _ = locate(None, file_input_xpaths, 0, usable=False)
+        if file_input is None:
+            # încercăm să apăsăm pe Foto/Photo ca să apară input-ul
+            photo_btn, _ = locate(None, photo_btn_xpaths, 0)
+            if photo_btn is not None:
+                photo_btn.click()
+                # input-ul apare după click: îl așteptăm în pagină
+                file_input, _ = locate(None, file_input_xpaths, 5, usable=False)
+        return file_input
+
+    def attach_images(paths, timeout):
+        """
+        Trimite toate imaginile într-un singur send_keys (input-ul e "multiple"),
+        apoi așteaptă să apară toate previzualizările. Previzualizările (blob:)
+        nu spun ce fișier a eșuat, așa că dacă lipsesc unele scoatem tot lotul
+        din composer și le trimitem pe rând: fiecare fișier e verificat și
+        reîncercat o dată, fără imagini duble. Dacă lotul nu poate fi scos,
+        nu retrimitem nimic (ar dubla imaginile deja atașate).
+        """
+        file_input = find_file_input()
+        if file_input is None:
+            print("[WARN] Nu am găsit input-ul de fișier pentru imagini.")
+            return
+        before = driver.execute_script(JS_UPLOAD_PREVIEWS)
+
+        if file_input.get_attribute("multiple") is not None:
+            file_input.send_keys("\n".join(paths))
+            print(f"[DEBUG] Am atașat {len(paths)} imagini dintr-o dată.")
+            wait_until_js(driver, JS_UPLOAD_PREVIEWS, timeout, before + len(paths), cancel=cancel)
+            done = driver.execute_script(JS_UPLOAD_PREVIEWS) - before
+            if done >= len(paths):
+                return
+            print(
+                f"[WARN] Doar {max(done, 0)}/{len(paths)} imagini au apărut în composer; "
+                "scot lotul și le atașez pe rând."
+            )
+            driver.execute_script(JS_CLEAR_PREVIEWS)
+            if not wait_until_js(driver, JS_PREVIEWS_AT_MOST, 10, before, cancel=cancel):
+                print("[WARN] Nu pot scoate imaginile din composer; nu le retrimit (ar apărea dublate).")
+                return
 
-    def try_click_xpaths(xpaths, log_prefix="composer"):
-        """Încearcă pe rând mai multe XPATH-uri până reușește un click."""
-        for xp in xpaths:
+        for path in paths:
             try:
-                el = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, xp))
-                )
-                driver.execute_script(
-                    "arguments[0].scrollIntoView({block:'center'});", el
-                )
-                el.click()
-                print(f"[DEBUG] {log_prefix} click cu XPATH: {xp}")
-                return True
-            except Exception:
-                continue
-        return False
+                count = driver.execute_script(JS_UPLOAD_PREVIEWS)
+                for attempt in (1, 2):
+                    # o previzualizare întârziată de la prima încercare: nu o dublăm
+                    if attempt > 1 and driver.execute_script(JS_UPLOAD_PREVIEWS, count + 1):
+                        break
+                    # Facebook poate înlocui input-ul după fiecare upload
+                    file_input = find_file_input()
+                    if file_input is None:
+                        print("[WARN] Input-ul de fișier a dispărut; nu pot atașa:", path)
+                        break
+                    file_input.send_keys(path)
+                    if wait_until_js(driver, JS_UPLOAD_PREVIEWS, 20, count + 1, cancel=cancel):
+                        print(f"[DEBUG] Am atașat imaginea: {path}")
+                        break
+                    print(f"[WARN] Imaginea nu s-a încărcat după 20s (încercarea {attempt}):", path)
+            except Exception as e:
+                print("[WARN] Nu pot atașa imaginea:", path, e)
 
     try:
         print(f"[DEBUG] Navighez la {group_url}")
         driver.get(group_url)
 
-        # așteptăm încărcarea paginii grupului
-        wait_for_facebook_home(driver, timeout=60)
-        time.sleep(3)  # mic delay pentru componentele dinamice
+        # așteptăm încărcarea paginii grupului (componentele dinamice le așteaptă locatorul)
+        wait_for_facebook_home(driver, timeout=60, cancel=cancel)
+        scopes = SelectorStats.scopes(page_locale(driver), group_url)
+        mark("navigate")
 
         if simulate:
             print("[DEBUG] Simulare activă – nu postez efectiv.")
-            return
+            return timings
 
         # --- 1. Caută butonul de composer în interiorul GroupInlineComposer ---
 
@@ -504,50 +2571,44 @@ def open_group_and_post(driver: webdriver.Chrome,
             "(//div[@data-pagelet='GroupInlineComposer']//div[@role='button'][.//span])[1]",
         ]
 
-        clicked = try_click_xpaths(group_inline_xpaths, log_prefix="GroupInlineComposer")
+        # --- 2. Pattern-urile generice RO/EN (după cele din GroupInlineComposer) ---
+        # o singură listă: SELECTOR_STATS o reordonează după ce a funcționat înainte
 
-        # --- 2. Dacă nu găsim în GroupInlineComposer, folosim pattern-urile generice RO/EN ---
+        generic_composer_xpaths = [
+            # română
+            "//div[@role='button'][.//span[contains(text(),'Scrie ceva')]]",
+            "//div[@role='button'][.//span[contains(text(),'Scrie acum')]]",
+            "//div[@role='button'][.//span[contains(text(),'Scrie o postare')]]",
+            "//div[@role='button'][.//span[contains(text(),'Creează o postare')]]",
 
-        if not clicked:
-            generic_composer_xpaths = [
-                # română
-                "//div[@role='button'][.//span[contains(text(),'Scrie ceva')]]",
-                "//div[@role='button'][.//span[contains(text(),'Scrie acum')]]",
-                "//div[@role='button'][.//span[contains(text(),'Scrie o postare')]]",
-                "//div[@role='button'][.//span[contains(text(),'Creează o postare')]]",
-
-                # engleză
-                "//div[@role='button'][.//span[contains(text(),'Create post')]]",
-                "//div[@role='button'][.//span[contains(text(),\"What's on your mind\")]]",
-                "//div[@role='button'][.//span[contains(text(),'Write something')]]",
-
-                # aria-label (în cazul în care textul e ascuns în aria-label)
-                "//div[@role='button' and @aria-label and "
-                " (contains(@aria-label,'postare') or contains(@aria-label,'Post'))]",
-            ]
-            clicked = try_click_xpaths(generic_composer_xpaths, log_prefix="composer")
+            # engleză
+            "//div[@role='button'][.//span[contains(text(),'Create post')]]",
+            "//div[@role='button'][.//span[contains(text(),\"What's on your mind\")]]",
+            "//div[@role='button'][.//span[contains(text(),'Write something')]]",
+
+            # aria-label (în cazul în care textul e ascuns în aria-label)
+            "//div[@role='button' and @aria-label and "
+            " (contains(@aria-label,'postare') or contains(@aria-label,'Post'))]",
+        ]
+
+        clicked = try_click_xpaths(group_inline_xpaths + generic_composer_xpaths)
 
         # --- 3. Fallback: click direct în primul textbox dacă nu găsim niciun buton ---
 
         if not clicked:
             try:
-                textbox_fallback = WebDriverWait(driver, 15).until(
-                    EC.element_to_be_clickable(
-                        (By.XPATH, "(//div[@role='textbox'])[1]")
-                    )
-                )
-                driver.execute_script(
-                    "arguments[0].scrollIntoView({block:'center'});",
-                    textbox_fallback,
-                )
-                textbox_fallback.click()
+                textbox_fallback, _ = locate(None, ["(//div[@role='textbox'])[1]"], 15)
+                if textbox_fallback is None:
+                    raise TimeoutError("niciun textbox vizibil")
+                click(textbox_fallback)
                 print("[DEBUG] Am dat click direct în primul textbox (fallback).")
             except Exception as e:
                 print(
                     "[WARN] Nu am putut găsi nici butonul de creare postare, "
                     "nici textbox-ul:", e
                 )
-                return
+                return timings
+        mark("composer")
 
         # --- 4. Găsește textbox-ul de postare (NU cel de comentarii) și scrie textul ---
 
@@ -572,35 +2633,20 @@ def open_group_and_post(driver: webdriver.Chrome,
                 "not(contains(@aria-label,'comment'))])[1]",
             ]
 
-            for xp in textbox_xpaths:
-                try:
-                    tb = WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.XPATH, xp))
-                    )
-                    driver.execute_script(
-                        "arguments[0].scrollIntoView({block:'center'});", tb
-                    )
-                    WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, xp))
-                    )
-                    try:
-                        tb.click()
-                    except Exception:
-                        # fallback JS click dacă Selenium clasic e interceptat
-                        driver.execute_script("arguments[0].click();", tb)
-                    textbox = tb
-                    print(f"[DEBUG] Am găsit textbox-ul de postare cu XPATH: {xp}")
-                    break
-                except Exception:
-                    continue
+            tb, xp = locate("textbox", textbox_xpaths, first_timeout=20)
+            if tb is not None:
+                click(tb)
+                textbox = tb
+                print(f"[DEBUG] Am găsit textbox-ul de postare cu XPATH: {xp}")
 
             if textbox is None:
                 print(
                     "[WARN] Nu am găsit textbox-ul de postare (probabil a rămas doar cel de comentarii)."
                 )
-                return
+                return timings
+            mark("textbox")
 
-            if text:
+            if post.text:
                 # încercăm varianta "user real": CTRL+A, DELETE, CTRL+V (din clipboard)
                 try:
                     # ne asigurăm că textbox-ul are focus
@@ -609,21 +2655,38 @@ def open_group_and_post(driver: webdriver.Chrome,
                     except Exception:
                         driver.execute_script("arguments[0].click();", textbox)
 
-                    time.sleep(0.2)  # mică pauză să prindă focusul
+                    # așteptăm să prindă focusul (în loc de o pauză fixă)
+                    wait_until_js(
+                        driver,
+                        "return arguments[0].contains(document.activeElement);",
+                        2,
+                        textbox,
+                        poll=0.05,
+                        cancel=cancel,
+                    )
 
                     textbox.send_keys(Keys.CONTROL, "a")
                     textbox.send_keys(Keys.DELETE)
 
                     # IMPORTANT: re-setăm clipboard-ul chiar înainte de fiecare paste,
                     # ca să nu conteze ce copiază userul între grupuri.
-                    ok = set_clipboard_text_windows(text)
+                    ok = set_clipboard_text_windows(post.clipboard)
                     if not ok:
                         print("[WARN] Nu am reușit să setez clipboard-ul. Încerc inserare prin JS.")
-                        set_text_via_js(driver, textbox, text)
+                        insert_via_js(textbox)
                     else:
-                        time.sleep(0.05)
                         textbox.send_keys(Keys.CONTROL, "v")
-                        time.sleep(0.05)
+                        # paste-ul a ajuns în editor? altfel inserăm prin JS
+                        if not wait_until_js(
+                            driver,
+                            "return (arguments[0].innerText || '').trim().length > 0;",
+                            3,
+                            textbox,
+                            poll=0.05,
+                            cancel=cancel,
+                        ):
+                            print("[WARN] Paste-ul nu a apărut în editor. Încerc inserare prin JS.")
+                            insert_via_js(textbox)
 
                     print("[DEBUG] Am introdus textul în postare (clipboard per post).")
                 except Exception as e:
@@ -631,93 +2694,173 @@ def open_group_and_post(driver: webdriver.Chrome,
                         "[WARN] Paste prin clipboard eșuat, încerc inserare prin JS:", e
                     )
                     # fallback: varianta JS, în caz că CTRL+V e blocat din vreun motiv
-                    set_text_via_js(driver, textbox, text)
+                    insert_via_js(textbox)
             else:
                 print("[DEBUG] Textul de postare este gol – nu introduc nimic.")
         except Exception as e:
             print("[WARN] Nu pot scrie textul postării:", e)
+        mark("text")
 
         # --- 5. Încarcă imaginile (dacă există) ---
 
-        for img_path in images or []:
-            abs_path = os.path.abspath(img_path)
-            try:
-                # input <input type="file" accept="image/...">
-                file_inputs = driver.find_elements(
-                    By.XPATH,
-                    "//input[@type='file' and contains(@accept, 'image')]",
-                )
-                file_input = file_inputs[0] if file_inputs else None
-
-                if file_input is None:
-                    # încercăm să apăsăm pe Foto/Photo ca să apară input-ul
-                    try:
-                        photo_btn = driver.find_element(
-                            By.XPATH,
-                            "//div[@role='button'][.//span[contains(text(),'Foto')] "
-                            " or .//span[contains(text(),'Photo')]]"
-                        )
-                        photo_btn.click()
-                        time.sleep(1)
-                        file_inputs = driver.find_elements(
-                            By.XPATH,
-                            "//input[@type='file' and contains(@accept, 'image')]",
-                        )
-                        file_input = file_inputs[0] if file_inputs else None
-                    except Exception:
-                        file_input = None
-
-                if file_input is None:
-                    print("[WARN] Nu am găsit input-ul de fișier pentru imagini.")
-                    break
-
-                file_input.send_keys(abs_path)
-                print(f"[DEBUG] Am atașat imaginea: {abs_path}")
-                time.sleep(1.5)
-            except Exception as e:
-                print("[WARN] Nu pot atașa imaginea:", abs_path, e)
-                break
+        if post.images:
+            attach_images(post.image_paths, post.upload_timeout)
+            mark("images")
 
         # --- 6. Apasă butonul de „Postare” ---
 
-        try:
-            post_btn = WebDriverWait(driver, 30).until(
-                EC.element_to_be_clickable((
-                    By.XPATH,
-                    "//div[@aria-label='Postează' or "
-                    "      @aria-label='Post' or "
-                    "      @aria-label='Trimite' or "
-                    "      @aria-label='Publică']"
-                ))
-            )
-            driver.execute_script(
-                "arguments[0].scrollIntoView({block:'center'});", post_btn
-            )
-            post_btn.click()
+        # primul candidat le acoperă pe toate (RO/EN): la pornire la rece, fără
+        # clasament în SELECTOR_STATS, nu așteptăm pe o etichetă din altă limbă
+        post_button_xpaths = [
+            "//div[@aria-label='Postează' or @aria-label='Post' or "
+            "@aria-label='Trimite' or @aria-label='Publică']",
+            "//div[@aria-label='Postează']",
+            "//div[@aria-label='Post']",
+            "//div[@aria-label='Trimite']",
+            "//div[@aria-label='Publică']",
+        ]
+        post_btn, post_xp = locate("post_button", post_button_xpaths, 30)
+        token = uuid.uuid4().hex
+        tracked = False
+        if post_btn is not None:
+            try:
+                tracked = bool(driver.execute_script(JS_MARK_COMPOSER, post_btn, token))
+            except Exception:
+                tracked = False
+        clicked = False
+        if post_btn is not None:
+            try:
+                click(post_btn)
+                clicked = True
+            except Exception as e:
+                print(f"[WARN] post_button: click eșuat pe {post_xp}:", e)
+        if clicked:
             print("[DEBUG] Am apăsat butonul de postare.")
-            time.sleep(3)
-        except Exception as e:
-            print("[WARN] Nu am găsit butonul de Postare:", e)
+            # nu plecăm din pagină până nu pleacă postarea (composer închis / confirmare)
+            mark("post_button")
+            submitted = wait_until_js(
+                driver,
+                JS_POST_SUBMITTED,
+                30 if tracked else POST_SETTLE_SEC,
+                token if tracked else None,
+                list(POST_CONFIRMATIONS),
+                poll=0.25,
+                cancel=cancel,
+            )
+            if not submitted and tracked:
+                print("[WARN] Nu am confirmarea trimiterii postării după 30s.")
+            elif not submitted:
+                # composer-ul nu a putut fi urmărit: am așteptat pauza fixă de siguranță
+                print(f"[DEBUG] Composer neurmărit – am așteptat {POST_SETTLE_SEC}s după postare.")
+            mark("submitted")
+        else:
+            print("[WARN] Nu am găsit butonul de Postare.")
 
     except Exception as e:
         print("[ERROR] Eroare în open_group_and_post pentru", group_url, ":", e)
+    finally:
+        print("[TIMING] " + " ".join(f"{k}={v:.1f}s" for k, v in timings.items()))
+
+    return timings
+
+
+# textele afișate în bara de status pentru pașii din open_group_and_post
+RUN_STEP_LABELS = {
+    "chrome": "pornesc Chrome",
+    "navigate": "grup deschis",
+    "composer": "composer deschis",
+    "textbox": "câmp text găsit",
+    "text": "text scris",
+    "images": "imagini atașate",
+    "post_button": "public",
+    "submitted": "publicat",
+    "delay": "pauză",
+}
+
+
+def format_duration(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+@dataclass(frozen=True)
+class RunProgress:
+    """
+    Starea rundei curente, publicată de run_posting la fiecare pas.
+    Momentele sunt time.monotonic(), ca UI-ul să poată actualiza
+    timpul scurs / rămas între evenimente.
+    """
+
+    index: int
+    total: int
+    step: str
+    started: float
+    finish_eta: float | None = None
+
+    def describe(self, now: float | None = None) -> str:
+        now = time.monotonic() if now is None else now
+        label = RUN_STEP_LABELS.get(self.step, self.step)
+        text = f"Grup {self.index}/{self.total} – {label} – {format_duration(now - self.started)}"
+        if self.finish_eta is not None:
+            text += f" (rămas ~{format_duration(self.finish_eta - now)})"
+        return text
 
 
 def run_posting(
-    groups, text: str, images, delay: int, simulate: bool = False, stop_event=None
+    groups,
+    text: str,
+    images,
+    delay: int,
+    simulate: bool = False,
+    cancel: CancelToken | None = None,
+    progress=None,
 ):
     """
     Rulează efectiv postarea în toate grupurile, cu delay între ele.
-    Poate fi întreruptă prin stop_event (Event) – se oprește între grupuri
-    și nu mai pornește noi postări după ce stop_event este setat.
+    Poate fi întreruptă prin `cancel` (CancelToken): orice așteptare din
+    postare sau din delay se oprește în cel mult ~o secundă, iar browserul
+    rămâne curat (about:blank, fără composer / dialog deschis).
+    Folosește sesiunea Chrome persistentă (DRIVER_SESSION).
+    `progress(RunProgress)` primește starea după fiecare pas (din acest thread).
     """
-    driver = None
-    try:
-        driver = create_driver()
-        wait_for_facebook_home(driver, timeout=60)
+    cancel = cancel or CancelToken()
+    post = PreparedPost.build(text, images)
+    run_timings: dict[str, list[float]] = {}
+    total = len(groups)
+    started = time.monotonic()
+    group_secs: list[float] = []
+    idx = 0
+    t_phase = started  # începutul grupului / pauzei curente
+
+    def report(step: str):
+        nonlocal t_phase
+        now = time.monotonic()
+        if step in ("chrome", "delay"):
+            t_phase = now
+        if progress is None:
+            return
+        # ETA: restul fazei curente + media grupurilor terminate pentru cele rămase
+        eta = None
+        if group_secs:
+            avg = sum(group_secs) / len(group_secs)
+            phase_len = int(delay) if step == "delay" else avg
+            left = total - idx
+            eta = (
+                now
+                + max(0.0, phase_len - (now - t_phase))
+                + left * avg
+                + (left - (1 if step == "delay" else 0)) * int(delay)
+            )
+        try:
+            progress(RunProgress(idx, total, step, started, eta))
+        except Exception as e:
+            print("[RUN] Eroare la raportarea progresului:", e)
 
+    try:
         for idx, group in enumerate(groups, start=1):
-            if stop_event is not None and stop_event.is_set():
+            if cancel.cancelled:
                 print("[RUN] Stop requested – opresc înainte de următorul grup.")
                 break
 
@@ -725,24 +2868,31 @@ def run_posting(
             if not group:
                 continue
             print(f"[RUN] ({idx}/{len(groups)}) {group}")
-            open_group_and_post(driver, group, text, images, simulate=simulate)
+            report("chrome")
+            # ping ieftin; dacă Chrome a căzut între grupuri, e repornit aici
+            driver = DRIVER_SESSION.acquire(cancel)
+            step_times = open_group_and_post(
+                driver, group, post, simulate=simulate, cancel=cancel, on_step=report
+            )
+            group_secs.append(time.monotonic() - t_phase)
+            for step, sec in (step_times or {}).items():
+                run_timings.setdefault(step, []).append(sec)
 
             if idx < len(groups):
-                # așteptăm delay-ul, dar ieșim mai rapid dacă se cere stop
-                total = int(delay)
-                for _ in range(total):
-                    if stop_event is not None and stop_event.is_set():
-                        print("[RUN] Stop requested în timpul delay-ului.")
-                        break
-                    time.sleep(1)
-                if stop_event is not None and stop_event.is_set():
+                report("delay")
+                # așteptăm delay-ul, dar ieșim imediat dacă se cere stop
+                if cancel.wait(int(delay)):
+                    print("[RUN] Stop requested în timpul delay-ului.")
                     break
+    except RunCancelled:
+        print("[RUN] Stop requested în timpul postării – opresc și las browserul curat.")
     finally:
-        if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+        DRIVER_SESSION.release()
+        if run_timings:
+            print(
+                "[TIMING] medie/grup: "
+                + " ".join(f"{k}={sum(v) / len(v):.1f}s" for k, v in run_timings.items())
+            )
 
 
 # ================== SCHEDULER ==================
@@ -758,137 +2908,748 @@ def parse_time_str(s: str):
         return None
 
 
-def next_run_time_for(config: dict, which: str):
-    enabled = config.get(f"schedule_enabled_{which}", False)
-    if not enabled:
-        return None
-    t = parse_time_str(config.get(f"schedule_time_{which}"))
-    if not t:
-        return None
+WEEKDAY_NAMES = ("lu", "ma", "mi", "jo", "vi", "sa", "du")
 
-    now = datetime.now()
-    candidate = datetime.combine(now.date(), t)
-    if candidate <= now:
-        candidate += timedelta(days=1)
-    return candidate
 
-def should_run_daily_slot(config: dict, which: str, now: datetime) -> bool:
+def parse_weekdays(spec: str) -> frozenset[int]:
     """
-    Decide dacă trebuie să rulăm acum slotul "which" (morning / evening).
-    Condiții:
-      - slotul e activat (schedule_enabled_morning/evening = True)
-      - ora configurată a trecut pentru ziua de azi
-      - nu am mai rulat deja azi pentru acest slot
+    "lu-vi,du" -> {0, 1, 2, 3, 4, 6} (luni = 0). Gol = toate zilele.
+    ValueError pentru zile necunoscute.
     """
-    enabled = config.get(f"schedule_enabled_{which}", False)
-    if not enabled:
-        return False
+    spec = (spec or "").strip().lower()
+    if not spec:
+        return frozenset(range(7))
+    days = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        a = WEEKDAY_NAMES.index(first[:2])
+        b = WEEKDAY_NAMES.index(last[:2]) if last else a
+        # intervalul poate trece peste duminică ("vi-lu")
+        days.update((a + i) % 7 for i in range((b - a) % 7 + 1))
+    return frozenset(days)
 
-    t = parse_time_str(config.get(f"schedule_time_{which}"))
-    if not t:
-        return False
 
-    # ora programată pentru astăzi
-    today = now.date()
-    scheduled_dt = datetime.combine(today, t)
+@dataclass(frozen=True)
+class ScheduleSlot:
+    id: str
+    at: dtime
+    days: frozenset[int]
 
-    # dacă încă nu am ajuns la ora programată, nu rulăm
-    if now < scheduled_dt:
-        return False
 
-    # verificăm dacă am mai rulat deja azi acest slot
-    last_key = f"last_run_{which}"
-    last_val = config.get(last_key)
-    last_date = None
-    if last_val:
-        try:
-            last_date = datetime.strptime(last_val, "%Y-%m-%d").date()
-        except Exception:
-            last_date = None
+class CompiledSchedule:
+    """
+    Programarea zilnică, parsată o singură dată: fiecare (zi, slot) devine
+    un offset în secunde față de luni 00:00, într-o listă sortată.
+    "Următoarea rundă după t" = bisect pe listă; zilele excluse sunt sărite.
+    """
 
-    # dacă am rulat deja azi, nu mai rulăm încă o dată
-    if last_date == today:
-        return False
+    DAY_SEC = 86400
+    # căutăm cel mult un an înainte (pentru excluderi foarte lungi)
+    MAX_WEEKS = 53
 
-    # marcăm că am rulat azi pentru acest slot
-    config[last_key] = today.strftime("%Y-%m-%d")
-    save_config(config)
-    return True
+    def __init__(self, slots: list[ScheduleSlot], exclude: frozenset):
+        entries = sorted(
+            (day * self.DAY_SEC + slot.at.hour * 3600 + slot.at.minute * 60, slot.id)
+            for slot in slots
+            for day in slot.days
+        )
+        self._offsets = [offset for offset, _ in entries]
+        self._ids = [slot_id for _, slot_id in entries]
+        self.exclude = exclude
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CompiledSchedule":
+        slots = []
+        for raw in config.get("schedule_slots") or []:
+            if not raw.get("enabled"):
+                continue
+            slot_id = str(raw.get("id") or raw.get("time") or "")
+            at = parse_time_str(raw.get("time"))
+            try:
+                days = parse_weekdays(raw.get("days", ""))
+            except ValueError:
+                days = None
+            if not slot_id or at is None or days is None:
+                print(f"[SCHEDULER] Slot invalid ignorat: {raw!r}")
+                continue
+            slots.append(ScheduleSlot(slot_id, at, days))
 
-def compute_next_schedule_run(config: dict):
-    times = []
-    for w in ("morning", "evening"):
-        nt = next_run_time_for(config, w)
-        if nt:
-            times.append(nt)
-    if not times:
+        exclude = set()
+        for raw in config.get("schedule_exclude_dates") or []:
+            try:
+                exclude.add(datetime.strptime(str(raw).strip(), "%Y-%m-%d").date())
+            except ValueError:
+                print(f"[SCHEDULER] Dată exclusă invalidă ignorată: {raw!r}")
+        return cls(slots, frozenset(exclude))
+
+    def __bool__(self) -> bool:
+        return bool(self._offsets)
+
+    @staticmethod
+    def _week_start(when: datetime) -> datetime:
+        return datetime.combine(when.date() - timedelta(days=when.weekday()), dtime())
+
+    def next_fire(self, after: datetime) -> tuple[datetime, str] | None:
+        """Prima rundă strict după "after": (momentul, id-ul slotului)."""
+        if not self._offsets:
+            return None
+        base = self._week_start(after)
+        offset = (after - base).total_seconds()
+        i = bisect.bisect_right(self._offsets, offset)
+        for week in range(self.MAX_WEEKS):
+            for j in range(i, len(self._offsets)):
+                when = base + timedelta(weeks=week, seconds=self._offsets[j])
+                if when.date() not in self.exclude:
+                    return when, self._ids[j]
+            i = 0
         return None
-    return min(times)
+
+    def due_today(self, now: datetime) -> list[str]:
+        """Sloturile de azi a căror oră a trecut (inclusiv cea curentă)."""
+        if now.date() in self.exclude:
+            return []
+        day_start = now.weekday() * self.DAY_SEC
+        offset = day_start + now.hour * 3600 + now.minute * 60 + now.second
+        lo = bisect.bisect_left(self._offsets, day_start)
+        hi = bisect.bisect_right(self._offsets, offset)
+        return self._ids[lo:hi]
+
+
+_COMPILED_SCHEDULE: tuple[str, CompiledSchedule] | None = None
+_COMPILED_SCHEDULE_LOCK = threading.Lock()
+
+
+def compiled_schedule(config: dict) -> CompiledSchedule:
+    """CompiledSchedule pentru config-ul curent; se recompilează doar la modificări."""
+    global _COMPILED_SCHEDULE
+    key = json.dumps(
+        [config.get("schedule_slots") or [], config.get("schedule_exclude_dates") or []],
+        sort_keys=True,
+    )
+    with _COMPILED_SCHEDULE_LOCK:
+        if _COMPILED_SCHEDULE is None or _COMPILED_SCHEDULE[0] != key:
+            _COMPILED_SCHEDULE = (key, CompiledSchedule.from_config(config))
+        return _COMPILED_SCHEDULE[1]
+
+
+def schedule_slot(config: dict, slot_id: str, default_time: str = "") -> dict:
+    """Slotul cu id-ul dat din schedule_slots (îl creează, dezactivat, dacă lipsește)."""
+    slots = config.setdefault("schedule_slots", [])
+    for slot in slots:
+        if slot.get("id") == slot_id:
+            return slot
+    slot = {"id": slot_id, "time": default_time, "days": "", "enabled": False}
+    slots.append(slot)
+    return slot
+
+
+def pending_schedule_slots(config: dict, now: datetime) -> list[str]:
+    """
+    Sloturile care trebuie rulate acum: ora lor de azi a trecut și
+    nu au mai rulat azi. Nu modifică config-ul (vezi claim_schedule_slots).
+    """
+    today = now.date().strftime("%Y-%m-%d")
+    last_runs = config.get("schedule_last_runs") or {}
+    return [
+        slot_id
+        for slot_id in compiled_schedule(config).due_today(now)
+        if last_runs.get(slot_id) != today
+    ]
+
+
+def claim_schedule_slots(config: dict, now: datetime) -> list[str]:
+    """Ca pending_schedule_slots, dar marchează sloturile ca rulate azi."""
+    pending = pending_schedule_slots(config, now)
+    if pending:
+        last_runs = dict(config.get("schedule_last_runs") or {})
+        today = now.date().strftime("%Y-%m-%d")
+        for slot_id in pending:
+            last_runs[slot_id] = today
+        config["schedule_last_runs"] = last_runs
+        save_config(config)
+    return pending
+
+
+def compute_next_schedule_run(config: dict):
+    nxt = compiled_schedule(config).next_fire(datetime.now())
+    return nxt[0] if nxt else None
+
+
+# plafonul unui somn al schedulerului: dacă laptopul intră în sleep sau ceasul
+# e mutat, termenele se recalculează cel târziu după atât
+SCHEDULER_MAX_SLEEP_SEC = 600
+# diferența ceas de perete vs. monotonic peste care considerăm că ora a sărit
+SCHEDULER_CLOCK_JUMP_SEC = 30
+# cât amânăm o rundă găsită peste una deja în curs
+SCHEDULER_BUSY_RETRY_SEC = 30
+# după ce cerem o rundă, run_now are nevoie de câteva secunde până apare
+# is_running; în acest interval nu pornim altă rundă
+SCHEDULER_RUN_GRACE_SEC = 60
 
 
 class SchedulerThread(threading.Thread):
     """
-    Thread care verifică periodic dacă e momentul să ruleze postarea programată.
-    Gestionează atât:
+    Thread care rulează postarea programată:
       - rundele fixe (dimineață/seară)
-      - cât și rundele repetitive (din X în X minute)
+      - rundele repetitive (din X în X minute)
+      - trezirea backend-ului și pre-warm-ul Chrome dinaintea lor
+
+    Termenele stau într-un heap (timestamp, job); thread-ul doarme pe un
+    Condition până la primul termen (max SCHEDULER_MAX_SLEEP_SEC) sau până
+    când UI-ul schimbă programarea (wake()). Fără joburi doarme nelimitat.
     """
 
     def __init__(self, app: "FacepostApp"):
         super().__init__(daemon=True)
         self.app = app
-        self._stop_flag = threading.Event()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._dirty = True
+        self._seq = itertools.count()
+        self._last_run_request: float | None = None
+        self._warm_done: set[tuple[str, float]] = set()
         self.last_interval_run: datetime | None = None
+        self._warmed_for: datetime | None = None
+        self._prewarmed_for: datetime | None = None
 
     def stop(self):
-        self._stop_flag.set()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def wake(self):
+        """Programarea s-a schimbat: recalculăm termenele imediat."""
+        with self._cond:
+            self._dirty = True
+            self._cond.notify_all()
+
+    def mark_interval_run(self, when: datetime):
+        """Runda repetitivă a pornit din UI; următoarea vine peste un interval."""
+        self.last_interval_run = when
+        self.wake()
+
+    def _interval_minutes(self, cfg: dict) -> int:
+        try:
+            minutes = int(cfg.get("interval_minutes") or 0)
+        except ValueError:
+            minutes = 0
+        # minim 5 minute ca protecție
+        return max(minutes, 5)
+
+    def _maybe_warm_up(self, cfg: dict, now: datetime) -> None:
+        """Trezește backend-ul cu BACKEND_WARMUP_LEAD_SEC înainte de următoarea rundă."""
+        targets = []
+        if cfg.get("daily_schedule_active"):
+            nxt = compute_next_schedule_run(cfg)
+            if nxt:
+                targets.append(nxt)
+        if (
+            cfg.get("interval_schedule_active")
+            and cfg.get("interval_enabled")
+            and self.last_interval_run is not None
+        ):
+            targets.append(
+                self.last_interval_run + timedelta(minutes=self._interval_minutes(cfg))
+            )
+        if not targets:
+            return
+        target = min(targets)
+        if target == self._warmed_for:
+            return
+        if 0 < (target - now).total_seconds() <= BACKEND_WARMUP_LEAD_SEC:
+            self._warmed_for = target
+            if API_CLIENT.latency.is_cold() or API_CLIENT.breaker.state != "closed":
+                print(f"[SCHEDULER] Trezesc backend-ul înainte de runda de la {target:%H:%M}.")
+                warm_up_backend()
+
+    def _maybe_prewarm_chrome(self, cfg: dict, now: datetime) -> None:
+        """
+        Pornește Chrome + Facebook cu chrome_prewarm_lead_sec înaintea
+        următoarei runde zilnice, ca postarea să înceapă exact la minutul
+        programat; o sesiune stricată (Chrome / login) apare acum, nu la rundă.
+        Pornirea (până la ~60s+) rulează pe TaskRunner, nu pe thread-ul
+        scheduler-ului; runda care vine între timp așteaptă driverul.
+        """
+        if (
+            not cfg.get("daily_schedule_active")
+            or not cfg.get("chrome_prewarm_enabled", True)
+            or self.app.is_running
+            or self.app.login_pending
+            or login_window_open()
+        ):
+            return
+        target = compute_next_schedule_run(cfg)
+        if target is None or target == self._prewarmed_for:
+            return
+        remaining = (target - now).total_seconds()
+        if not 0 < remaining <= chrome_prewarm_lead_sec(cfg):
+            return
+
+        self._prewarmed_for = target
+
+        def _done(result: tuple[bool, str]) -> None:
+            ok, msg = result
+            if ok:
+                print("[SCHEDULER] Chrome pregătit, Facebook logat.")
+                return
+            print("[SCHEDULER] Pre-warm eșuat:", msg)
+            self.app.ui.publish("status", f"Atenție – runda de la {target:%H:%M} poate eșua: {msg}")
+
+        print(f"[SCHEDULER] Pregătesc Chrome pentru runda de la {target:%H:%M}.")
+        if not self.app.tasks.submit("chrome_prewarm", prewarm_chrome, remaining + 300, on_done=_done):
+            print("[SCHEDULER] Un pre-warm este deja în curs.")
+
+    def _job(self, due: datetime | float, kind: str, arg=None) -> tuple:
+        ts = due.timestamp() if isinstance(due, datetime) else due
+        return (ts, next(self._seq), kind, arg)
+
+    def _plan(self, cfg: dict, now: datetime) -> list:
+        """Construiește heap-ul de joburi din CONFIG."""
+        jobs = []
+        targets = []
+        now_ts = now.timestamp()
+
+        if cfg.get("daily_schedule_active"):
+            if pending_schedule_slots(cfg, now):
+                jobs.append(self._job(now, "daily"))
+            nxt = compute_next_schedule_run(cfg)
+            if nxt:
+                jobs.append(self._job(nxt, "daily"))
+                targets.append(nxt)
+                if cfg.get("chrome_prewarm_enabled", True):
+                    due = nxt.timestamp() - chrome_prewarm_lead_sec(cfg)
+                    jobs.append(self._job(due, "prewarm", nxt.timestamp()))
+
+        if cfg.get("interval_schedule_active") and cfg.get("interval_enabled"):
+            if self.last_interval_run is None:
+                jobs.append(self._job(now, "interval"))
+            else:
+                due = self.last_interval_run + timedelta(
+                    minutes=self._interval_minutes(cfg)
+                )
+                jobs.append(self._job(max(due, now), "interval"))
+                targets.append(due)
+
+        if targets:
+            target = min(targets).timestamp()
+            jobs.append(self._job(target - BACKEND_WARMUP_LEAD_SEC, "warmup", target))
+
+        # joburile de pregătire rulează o singură dată per rundă țintă
+        self._warm_done = {d for d in self._warm_done if d[1] > now_ts}
+        jobs = [
+            j for j in jobs
+            if j[2] not in ("warmup", "prewarm")
+            or (j[3] > now_ts and (j[2], j[3]) not in self._warm_done)
+        ]
+        heapq.heapify(jobs)
+        return jobs
+
+    def _busy(self) -> bool:
+        # fereastra de login deschisă: amânăm runda până o închide userul
+        if self.app.is_running or self.app.login_pending or login_window_open():
+            return True
+        return (
+            self._last_run_request is not None
+            and time.monotonic() - self._last_run_request < SCHEDULER_RUN_GRACE_SEC
+        )
+
+    def _fire(self, kind: str, arg) -> float | None:
+        """
+        Execută un job. Întoarce peste câte secunde trebuie reîncercat
+        (rundă deja în curs) sau None dacă termenele trebuie recalculate.
+        """
+        cfg = CONFIG
+        now = datetime.now()
+
+        if kind in ("warmup", "prewarm"):
+            self._warm_done.add((kind, arg))
+            if kind == "warmup":
+                self._maybe_warm_up(cfg, now)
+            else:
+                self._maybe_prewarm_chrome(cfg, now)
+            return None
+
+        if kind == "daily":
+            if not cfg.get("daily_schedule_active"):
+                return None
+            if not pending_schedule_slots(cfg, now):
+                return None
+            if self._busy():
+                return SCHEDULER_BUSY_RETRY_SEC
+            # marcăm toate sloturile restante: dacă au căzut împreună rulăm o singură dată
+            slots = claim_schedule_slots(cfg, now)
+            if slots:
+                print(f"[SCHEDULER] Rulez rundă programată ({', '.join(slots)}).")
+                self._last_run_request = time.monotonic()
+                self.app.ui.call(self.app.run_now, simulate=False, from_scheduler=True)
+            return None
+
+        if kind == "interval":
+            if not (cfg.get("interval_schedule_active") and cfg.get("interval_enabled")):
+                return None
+            if self._busy():
+                return SCHEDULER_BUSY_RETRY_SEC
+            print("[SCHEDULER] Rulez rundă repetitivă.")
+            self._last_run_request = time.monotonic()
+            self.app.ui.call(self.app.run_now, simulate=False, from_scheduler=True)
+            self.last_interval_run = datetime.now()
+            return None
+
+        return None
 
     def run(self):
-        while not self._stop_flag.is_set():
-            try:
-                now = datetime.now()
-                cfg = CONFIG
-
-                # 1) Programare zilnică dimineață/seară – doar dacă este activă
-                if cfg.get("daily_schedule_active") and not self.app.is_running:
-                    run_morning = should_run_daily_slot(cfg, "morning", now)
-                    run_evening = should_run_daily_slot(cfg, "evening", now)
-
-                    if run_morning or run_evening:
-                        print("[SCHEDULER] Rulez rundă programată (dimineață/seară).")
-                        self.app.run_now(simulate=False, from_scheduler=True)
-                        # așteptăm puțin ca să nu dublăm runda în același interval
-                        time.sleep(60)
-                        continue
-
-                # 2) Programare repetitivă (din X în X minute) – doar dacă este activă și configurată
-                if cfg.get("interval_schedule_active") and cfg.get("interval_enabled"):
+        heap: list = []
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                if self._dirty:
+                    self._dirty = False
                     try:
-                        minutes = int(cfg.get("interval_minutes") or 0)
-                    except ValueError:
-                        minutes = 0
-
-                    # minim 5 minute ca protecție
-                    if minutes < 5:
-                        minutes = 5
+                        heap = self._plan(CONFIG, datetime.now())
+                    except Exception as e:
+                        print("[SCHEDULER ERROR]", e)
+                        heap = [self._job(time.time() + 10, "replan")]
+                if not heap:
+                    self._cond.wait()
+                    continue
 
-                    should_run = False
-                    if self.last_interval_run is None:
-                        should_run = True
-                    else:
-                        delta_sec = (now - self.last_interval_run).total_seconds()
-                        if delta_sec >= minutes * 60:
-                            should_run = True
+                delay = heap[0][0] - time.time()
+                if delay > 0:
+                    wall0, mono0 = time.time(), time.monotonic()
+                    self._cond.wait(min(delay, SCHEDULER_MAX_SLEEP_SEC))
+                    # ceasul de perete a sărit (sleep/hibernare, oră schimbată)?
+                    jump = (time.time() - wall0) - (time.monotonic() - mono0)
+                    if abs(jump) > SCHEDULER_CLOCK_JUMP_SEC:
+                        print(f"[SCHEDULER] Ora sistemului a sărit cu {jump:+.0f}s – recalculez termenele.")
+                        self._dirty = True
+                    continue
 
-                    if should_run and not self.app.is_running:
-                        print("[SCHEDULER] Rulez rundă repetitivă.")
-                        self.app.run_now(simulate=False, from_scheduler=True)
-                        self.last_interval_run = datetime.now()
+                _, _, kind, arg = heapq.heappop(heap)
 
-                time.sleep(5)
+            try:
+                retry = self._fire(kind, arg)
             except Exception as e:
                 print("[SCHEDULER ERROR]", e)
-                time.sleep(10)
+                retry = 10
+
+            with self._cond:
+                if retry is not None:
+                    heapq.heappush(heap, self._job(time.time() + retry, kind, arg))
+                else:
+                    self._dirty = True
+
+
+# ================== VERIFICARE UPDATE ==================
+
+class UpdateFeed:
+    """
+    Polling condiționat pentru /client-version.
+
+    - trimite If-None-Match / If-Modified-Since => în regim normal serverul
+      răspunde 304, fără corp
+    - intervalul până la următorul poll vine de la server (Cache-Control
+      max-age, Retry-After la 429/503), limitat la [MIN, MAX]
+    - răspunsul (versiune + URL de download) e păstrat pe disc; /client-download
+      se cere o singură dată per versiune, doar dacă /client-version nu
+      include deja URL-ul
+    """
+
+    DEFAULT_INTERVAL_SEC = 300
+    MIN_INTERVAL_SEC = 60
+    MAX_INTERVAL_SEC = 6 * 3600
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._state: dict | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if self._state is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except FileNotFoundError:
+                self._state = {}
+            except Exception as e:
+                print("[UPDATE] Cache de update ilizibil, îl ignor:", e)
+                self._state = {}
+        return self._state
+
+    def _save(self) -> None:
+        try:
+            atomic_write_text(self.path, json.dumps(self._state, ensure_ascii=False))
+        except Exception as e:
+            print("[UPDATE] Nu pot salva cache-ul de update:", e)
+
+    def _parse_delay(self, r) -> float:
+        retry_after = r.headers.get("Retry-After")
+        if retry_after and r.status_code in (429, 503):
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                from email.utils import parsedate_to_datetime
+
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(UTC)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = self.DEFAULT_INTERVAL_SEC
+        else:
+            cache_control = r.headers.get("Cache-Control", "")
+            m = re.search(r"max-age=(\d+)", cache_control)
+            delay = float(m.group(1)) if m else self.DEFAULT_INTERVAL_SEC
+        return min(max(delay, self.MIN_INTERVAL_SEC), self.MAX_INTERVAL_SEC)
+
+    def poll(self) -> tuple[dict | None, float]:
+        """
+        Întoarce (datele de la /client-version sau None la eroare,
+        secunde până la următorul poll).
+        """
+        with self._lock:
+            state = self._load()
+            headers = {}
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+            try:
+                # fără retry: următorul poll e oricum reîncercarea
+                r = API_CLIENT.request(
+                    "GET", "/client-version", headers=headers, idempotent=False
+                )
+            except Exception as e:
+                print("[UPDATE] Eroare la /client-version:", e)
+                return None, self.DEFAULT_INTERVAL_SEC
+
+            delay = self._parse_delay(r)
+            if r.status_code == 304 and state.get("data") is not None:
+                return state["data"], delay
+            if r.status_code != 200:
+                print(f"[UPDATE] /client-version a răspuns HTTP {r.status_code}")
+                return None, delay
+            try:
+                data = r.json()
+            except ValueError:
+                print("[UPDATE] Răspuns invalid de la /client-version")
+                return None, delay
+
+            state["data"] = data
+            state["etag"] = r.headers.get("ETag")
+            state["last_modified"] = r.headers.get("Last-Modified")
+            self._save()
+            return data, delay
+
+    def download_info(self, version: str) -> dict | None:
+        """
+        {"url": ..., "sha256": ..., "patches": [...], "zip_url": ..., "zip_sha256": ...}
+        pentru versiunea dată (zip_* = arhiva one-folder, dacă serverul o oferă),
+        din cache dacă se poate.
+        """
+        with self._lock:
+            state = self._load()
+            data = state.get("data") or {}
+            url = data.get("download_url") or data.get("url")
+            if url and str(data.get("version") or "").strip() == version:
+                return {
+                    "url": url,
+                    "sha256": data.get("sha256"),
+                    "patches": data.get("patches") or [],
+                    "zip_url": data.get("zip_url"),
+                    "zip_sha256": data.get("zip_sha256"),
+                }
+
+            cached = (state.get("downloads") or {}).get(version)
+            if cached and cached.get("url"):
+                return cached
+
+            try:
+                r = API_CLIENT.request("GET", "/client-download")
+                d2 = r.json()
+            except Exception as e:
+                print("[UPDATE] Eroare la /client-download:", e)
+                return None
+            if not d2.get("url"):
+                return None
+            # păstrăm doar intrarea pentru versiunea curentă de pe server
+            state["downloads"] = {version: d2}
+            self._save()
+            return d2
+
+
+UPDATE_FEED = UpdateFeed(UPDATE_CACHE_FILE)
+
+
+def update_poll_phase(device_id: str, interval: float) -> float:
+    """Decalaj stabil per device în intervalul de poll (clienții nu mai vin în valuri)."""
+    h = hashlib.sha256((device_id or platform.node()).encode("utf-8")).hexdigest()
+    return int(h[:8], 16) % max(1, int(interval))
+
+
+# ================== EVENIMENTE UI ==================
+
+class UIEventQueue:
+    """
+    Singurul drum de la thread-urile de lucru la Tk.
+
+    Oricine (scheduler, rulare, task-uri) publică evenimente (tip, date) în
+    coadă; o pompă root.after din thread-ul Tk le golește la fiecare
+    PUMP_MS și le aplică în lot, în ordinea publicării. Pentru tipurile din
+    COALESCE (status, progres), o serie de evenimente consecutive de același
+    tip se reduce la ultimul – un singur redraw, fără a sări peste altele.
+    """
+
+    PUMP_MS = 100
+    COALESCE = ("status", "progress")
+
+    def __init__(self, root):
+        self.root = root
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handlers: dict[str, object] = {}
+        self._started = False
+
+    def on(self, kind: str, handler) -> None:
+        self._handlers[kind] = handler
+
+    def publish(self, kind: str, payload=None) -> None:
+        """Sigur din orice thread."""
+        self._queue.put((kind, payload))
+
+    def call(self, fn, *args, **kwargs) -> None:
+        """Rulează fn(*args, **kwargs) în thread-ul Tk, la următoarea pompare."""
+        self._queue.put(("call", (fn, args, kwargs)))
+
+    def start(self) -> None:
+        if not self._started:
+            self._started = True
+            self.root.after(self.PUMP_MS, self._pump)
+
+    def _dispatch(self, kind: str, payload) -> None:
+        try:
+            if kind == "call":
+                fn, args, kwargs = payload
+                fn(*args, **kwargs)
+                return
+            handler = self._handlers.get(kind)
+            if handler is None:
+                print(f"[UI] Eveniment fără handler: {kind}")
+                return
+            handler(payload)
+        except Exception as e:
+            print(f"[UI] Eroare la evenimentul {kind}:", e)
+
+    def _pump(self) -> None:
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for i, (kind, payload) in enumerate(batch):
+            # urmează încă unul de același tip -> acesta ar fi redesenat degeaba
+            if kind in self.COALESCE and i + 1 < len(batch) and batch[i + 1][0] == kind:
+                continue
+            self._dispatch(kind, payload)
+        try:
+            self.root.after(self.PUMP_MS, self._pump)
+        except tk.TclError:
+            # fereastra a fost închisă
+            pass
+
+
+# ================== TASK-URI ÎN FUNDAL ==================
+
+class TaskRunner:
+    """
+    Rulează apeluri blocante (HTTP) pe un pool de thread-uri și livrează
+    rezultatul în thread-ul Tk prin UIEventQueue, ca fereastra să nu înghețe.
+
+    Task-urile au o cheie: cât timp unul e în lucru, un al doilea cu aceeași
+    cheie (ex: click repetat pe buton) e ignorat. Listener-ii primesc
+    (cheie, ocupat) în thread-ul Tk – pentru indicatorii din UI.
+
+    Worker-ii sunt thread-uri daemon (nu ThreadPoolExecutor): la ieșire,
+    un request HTTP sau o închidere de Chrome în curs nu mai țin procesul
+    în viață – altfel updater-ul așteaptă degeaba după --parent-pid.
+    """
+
+    def __init__(self, ui: UIEventQueue, max_workers: int = 4):
+        self.ui = ui
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._closed = False
+        self._in_flight: set[str] = set()
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback) -> None:
+        self._listeners.append(callback)
+
+    def is_busy(self, key: str) -> bool:
+        with self._lock:
+            return key in self._in_flight
+
+    def submit(self, key: str, fn, *args, on_done=None, on_error=None) -> bool:
+        """Pornește fn(*args) în fundal. Întoarce False dacă task-ul e deja în lucru."""
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        self._notify(key, True)
+        from concurrent.futures import Future
+
+        future = Future()
+        future.add_done_callback(
+            lambda fut: self._deliver(key, fut, on_done, on_error)
+        )
+        threading.Thread(
+            target=self._work, args=(future, fn, args),
+            name=f"FacepostTask-{key}", daemon=True,
+        ).start()
+        return True
+
+    def _work(self, future, fn, args) -> None:
+        with self._slots:
+            # după shutdown() task-urile încă neîncepute nu mai pornesc
+            if self._closed or not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _notify(self, key: str, busy: bool) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            # submit() poate fi apelat și din alte thread-uri -> UI-ul doar din Tk
+            self.ui.call(self._notify, key, busy)
+            return
+        for callback in self._listeners:
+            try:
+                callback(key, busy)
+            except Exception as e:
+                print("[TASK] Eroare în listener:", e)
+
+    def _deliver(self, key, future, on_done, on_error) -> None:
+        # rulează în thread-ul worker -> trecem în thread-ul Tk
+        def _on_ui():
+            with self._lock:
+                self._in_flight.discard(key)
+            self._notify(key, False)
+            exc = future.exception()
+            if exc is not None:
+                if on_error is not None:
+                    on_error(exc)
+                else:
+                    print(f"[TASK] {key} a eșuat:", exc)
+            elif on_done is not None:
+                on_done(future.result())
+
+        self.ui.call(_on_ui)
+
+    def shutdown(self) -> None:
+        self._closed = True
 
 
 # ================== TKINTER UI ==================
@@ -898,28 +3659,33 @@ class FacepostApp:
         self.root = root
         self.root.title(APP_NAME)
         self.is_running = False
-        self.images = set(CONFIG.get("images", []))
+        self.login_pending = False  # login Facebook în curs de deschidere
+        self.exiting_for_update = False  # închidere cerută de update -> ieșire imediată
+        self.images = set(get_content(CONFIG, "images"))
         self.scheduler_thread = None
-        self.stop_event = None  # pentru a opri rularea curentă
+        self.cancel_token: CancelToken | None = None  # pentru a opri rularea curentă
         # starea de update
         self.update_info = None        # dict cu info despre update (dacă există)
         self.update_pending = False    # dacă trebuie făcut update după runda curentă
+        self.staged_update: Path | None = None  # noua versiune, descărcată și verificată
 
         self.email_var = tk.StringVar(value=CONFIG.get("email", ""))
         self.delay_var = tk.StringVar(value=str(CONFIG.get("delay_seconds", 120)))
         self.simulate_var = tk.BooleanVar(value=CONFIG.get("simulate", False))
 
+        morning = schedule_slot(CONFIG, "morning", "08:00")
+        evening = schedule_slot(CONFIG, "evening", "20:00")
         self.schedule_enabled_morning_var = tk.BooleanVar(
-            value=CONFIG.get("schedule_enabled_morning", False)
+            value=bool(morning.get("enabled"))
         )
         self.schedule_time_morning_var = tk.StringVar(
-            value=CONFIG.get("schedule_time_morning", "08:00")
+            value=morning.get("time") or "08:00"
         )
         self.schedule_enabled_evening_var = tk.BooleanVar(
-            value=CONFIG.get("schedule_enabled_evening", False)
+            value=bool(evening.get("enabled"))
         )
         self.schedule_time_evening_var = tk.StringVar(
-            value=CONFIG.get("schedule_time_evening", "20:00")
+            value=evening.get("time") or "20:00"
         )
 
         self.interval_enabled_var = tk.BooleanVar(
@@ -937,11 +3703,22 @@ class FacepostApp:
             value=CONFIG.get("interval_schedule_active", False)
         )
 
+        # evenimentele din thread-urile de lucru ajung în Tk doar prin această coadă
+        self.ui = UIEventQueue(root)
+        self.ui.on("status", lambda text: self.status_var.set(text))
+        self.ui.on("progress", self._on_run_progress)
+        self.ui.on("run_finished", self._on_run_finished)
+        self.run_progress: RunProgress | None = None
+
+        self.tasks = TaskRunner(self.ui)
+        self.tasks.add_listener(self._on_task_state)
+
         self._build_ui()
         self._load_initial_texts()
         self._update_daily_button_text()
         self._update_interval_button_text()
         self._update_run_button_text()
+        self.ui.start()
         self._start_scheduler_if_needed()
 
         # pornim thread-ul care verifică periodic update-urile
@@ -1071,7 +3848,7 @@ class FacepostApp:
             pady=(12, 4),
         )
 
-        check_btn = tk.Button(
+        self.check_btn = check_btn = tk.Button(
             config_card,
             text="Verifică licența",
             command=self.check_license_clicked,
@@ -1086,7 +3863,7 @@ class FacepostApp:
         )
         check_btn.grid(row=1, column=0, sticky="w", padx=16, pady=4)
 
-        bind_btn = tk.Button(
+        self.bind_btn = bind_btn = tk.Button(
             config_card,
             text="Activează licența",
             command=self.bind_license_clicked,
@@ -1136,7 +3913,7 @@ class FacepostApp:
         tk.Button(
             fb_btns,
             text="Conectează-te la Facebook",
-            command=lambda: configure_facebook_login(self.root, mode="login"),
+            command=lambda: self._open_facebook_login("login"),
             bg=COLORS["card"],
             fg=COLORS["text"],
             relief="ridge",
@@ -1147,7 +3924,7 @@ class FacepostApp:
         tk.Button(
             fb_btns,
             text="Schimbă profilul de Facebook",
-            command=lambda: configure_facebook_login(self.root, mode="switch"),
+            command=lambda: self._open_facebook_login("switch"),
             bg=COLORS["card"],
             fg=COLORS["text"],
             relief="ridge",
@@ -1155,6 +3932,17 @@ class FacepostApp:
             pady=6,
         ).pack(side="left", padx=(8, 0))
 
+        tk.Button(
+            fb_btns,
+            text="Raport selectori",
+            command=self.show_selector_report,
+            bg=COLORS["card"],
+            fg=COLORS["text"],
+            relief="ridge",
+            padx=10,
+            pady=6,
+        ).pack(side="right")
+
         # ====== CARD: Conținut postare ======
         post_card = create_card(main_frame, "Conținut postare", expand=True)
 
@@ -1435,10 +4223,10 @@ class FacepostApp:
 
     def _load_initial_texts(self):
         self.post_text.delete("1.0", "end")
-        self.post_text.insert("1.0", CONFIG.get("post_text", ""))
+        self.post_text.insert("1.0", get_content(CONFIG, "post_text"))
 
         self.group_text.delete("1.0", "end")
-        self.group_text.insert("1.0", CONFIG.get("groups_text", ""))
+        self.group_text.insert("1.0", get_content(CONFIG, "groups_text"))
 
         self.images_listbox.delete(0, "end")
         for img in self.images:
@@ -1448,6 +4236,23 @@ class FacepostApp:
         self._update_post_stats()
         self._update_group_stats()
 
+        if MISSING_CONTENT:
+            names = {
+                "post_text": "textul postării",
+                "groups_text": "lista de grupuri",
+                "images": "lista de imagini",
+            }
+            missing = ", ".join(names.get(k, k) for k in sorted(MISSING_CONTENT))
+            self.root.after_idle(
+                lambda: messagebox.showwarning(
+                    APP_NAME,
+                    f"Nu am putut citi {missing} din {CONTENT_DIR}.\n\n"
+                    "Câmpurile apar goale, dar conținutul salvat nu a fost șters. "
+                    "Dacă apeși „Salvează config”, va fi înlocuit cu ce e acum pe ecran.",
+                    parent=self.root,
+                )
+            )
+
     def _start_scheduler_if_needed(self):
         if self.scheduler_thread is not None:
             return
@@ -1457,6 +4262,10 @@ class FacepostApp:
             self.scheduler_thread = SchedulerThread(self)
             self.scheduler_thread.start()
 
+    def _wake_scheduler(self):
+        if self.scheduler_thread is not None:
+            self.scheduler_thread.wake()
+
     def _update_daily_button_text(self):
         if getattr(self, "daily_button", None) is None:
             return
@@ -1555,6 +4364,60 @@ class FacepostApp:
             pass
         self._update_group_stats()
 
+    def _on_task_state(self, key: str, busy: bool):
+        """Indicatori "în lucru" pe butoanele care au un request în fundal."""
+        if key == "run_license":
+            if busy:
+                self.status_var.set("Verific licența...")
+                self.run_btn.config(text="Se verifică licența...", state="disabled")
+            else:
+                self.run_btn.config(state="normal")
+                if not self.is_running:
+                    self.status_var.set("Gata de lucru.")
+                self._update_run_button_text()
+            return
+
+        buttons = {
+            "check_license": (getattr(self, "check_btn", None), "Verifică licența", "Se verifică..."),
+            "bind_license": (getattr(self, "bind_btn", None), "Activează licența", "Se activează..."),
+        }
+        if key not in buttons:
+            return
+        btn, idle_text, busy_text = buttons[key]
+        if btn is not None:
+            btn.config(
+                text=busy_text if busy else idle_text,
+                state="disabled" if busy else "normal",
+            )
+
+    def _open_facebook_login(self, mode: str):
+        """Login Facebook doar când nu rulează nimic; sesiunea Chrome se închide în fundal."""
+        if self.is_running:
+            messagebox.showwarning(
+                APP_NAME,
+                "Rulează o sesiune de postare. Oprește-o sau așteaptă să se termine "
+                "înainte de a deschide login-ul Facebook.",
+                parent=self.root,
+            )
+            return
+
+        def _open(_):
+            try:
+                configure_facebook_login(self.root, mode=mode)
+            finally:
+                self.login_pending = False
+
+        def _failed(exc):
+            self.login_pending = False
+            print("[DRIVER] Nu pot închide sesiunea Chrome:", exc)
+
+        if self.tasks.submit(
+            "facebook_login", DRIVER_SESSION.close, True, on_done=_open, on_error=_failed
+        ):
+            # până se deschide fereastra de login nu pornim nicio rundă (nici din scheduler);
+            # on_done vine tot prin thread-ul Tk, deci după această linie
+            self.login_pending = True
+
     def _update_run_button_text(self):
         if self.is_running:
             self.run_btn.config(
@@ -1586,6 +4449,7 @@ class FacepostApp:
 
         if active_daily or active_interval:
             self._start_scheduler_if_needed()
+            self._wake_scheduler()
         else:
             # Oprim schedulerul dacă nu mai e nimic activ
             if self.scheduler_thread is not None:
@@ -1669,7 +4533,7 @@ class FacepostApp:
             self.run_now(simulate=None, from_scheduler=False)
             # scheduler-ul va continua de la acest moment
             if self.scheduler_thread is not None:
-                self.scheduler_thread.last_interval_run = datetime.now()
+                self.scheduler_thread.mark_interval_run(datetime.now())
 
     # ---------- acțiuni config & schedule ----------
 
@@ -1684,14 +4548,7 @@ class FacepostApp:
             CONFIG["delay_seconds"] = 120
         CONFIG["simulate"] = bool(self.simulate_var.get())
 
-        CONFIG["schedule_enabled_morning"] = bool(
-            self.schedule_enabled_morning_var.get()
-        )
-        CONFIG["schedule_time_morning"] = self.schedule_time_morning_var.get().strip()
-        CONFIG["schedule_enabled_evening"] = bool(
-            self.schedule_enabled_evening_var.get()
-        )
-        CONFIG["schedule_time_evening"] = self.schedule_time_evening_var.get().strip()
+        self._sync_schedule_slots()
 
         try:
             interval_minutes = int(self.interval_minutes_var.get() or "0")
@@ -1700,9 +4557,19 @@ class FacepostApp:
         CONFIG["interval_enabled"] = bool(self.interval_enabled_var.get())
         CONFIG["interval_minutes"] = interval_minutes
 
-        save_config(CONFIG)
+        save_config(CONFIG, immediate=True)
+        self._wake_scheduler()
         messagebox.showinfo(APP_NAME, "Config salvată.", parent=self.root)
 
+    def _sync_schedule_slots(self):
+        for which, enabled_var, time_var in (
+            ("morning", self.schedule_enabled_morning_var, self.schedule_time_morning_var),
+            ("evening", self.schedule_enabled_evening_var, self.schedule_time_evening_var),
+        ):
+            slot = schedule_slot(CONFIG, which)
+            slot["enabled"] = bool(enabled_var.get())
+            slot["time"] = time_var.get().strip()
+
     def schedule_changed(self):
         """
         Sincronizează din UI în CONFIG:
@@ -1710,17 +4577,8 @@ class FacepostApp:
           - bifa + minute pentru programarea repetitivă
         și salvează imediat în fișierul de config.
         """
-        # dimineața
-        CONFIG["schedule_enabled_morning"] = bool(
-            self.schedule_enabled_morning_var.get()
-        )
-        CONFIG["schedule_time_morning"] = self.schedule_time_morning_var.get().strip()
-
-        # seara
-        CONFIG["schedule_enabled_evening"] = bool(
-            self.schedule_enabled_evening_var.get()
-        )
-        CONFIG["schedule_time_evening"] = self.schedule_time_evening_var.get().strip()
+        # dimineața / seara (celelalte sloturi din config rămân neatinse)
+        self._sync_schedule_slots()
 
         # interval repetitiv
         try:
@@ -1732,6 +4590,7 @@ class FacepostApp:
         CONFIG["interval_minutes"] = interval_minutes
 
         save_config(CONFIG)
+        self._wake_scheduler()
 
         # ---------- LOGICA DE UPDATE AUTOMAT ----------
 
@@ -1742,60 +4601,58 @@ class FacepostApp:
         except Exception:
             return (0, 0, 0)
 
-    def _check_for_update_once(self) -> dict | None:
+    def _check_for_update_once(self) -> tuple[dict | None, float]:
         """
-        Face un singur request la backend și întoarce info despre update dacă există.
-        return:
-          None   -> nu există update sau eroare
-          dict   -> {"version": ..., "notes": ..., "download_url": ...}
+        Face un poll (condiționat) la backend și întoarce info despre update dacă există.
+        return: (info, secunde până la următorul poll)
+          info None -> nu există update sau eroare
+          info dict -> {"version": ..., "notes": ..., "download_url": ..., "sha256": ..., "zip_url": ...}
         """
-        server_base = CONFIG.get("server_url", API_URL).rstrip("/")
-
-        try:
-            r = requests.get(f"{server_base}/client-version", timeout=10)
-            data = r.json()
-        except Exception as e:
-            print("[UPDATE] Eroare la /client-version:", e)
-            return None
+        data, delay = UPDATE_FEED.poll()
+        if data is None:
+            return None, delay
 
         server_ver = str(data.get("version") or "").strip()
         if not server_ver:
-            return None
+            return None, delay
 
         if self._parse_version(server_ver) <= self._parse_version(CLIENT_VERSION):
             # suntem la zi
-            return None
+            return None, delay
+        if server_ver == blocked_update_version():
+            # utilizatorul a făcut rollback de la versiunea asta
+            return None, delay
 
         notes = data.get("notes", "")
 
-        # luăm URL-ul de download
-        try:
-            r2 = requests.get(f"{server_base}/client-download", timeout=10)
-            d2 = r2.json()
-            download_url = d2.get("url")
-        except Exception as e:
-            print("[UPDATE] Eroare la /client-download:", e)
-            return None
-
-        if not download_url:
-            return None
+        # luăm URL-ul de download (din cache / din răspunsul de versiune dacă îl include)
+        d2 = UPDATE_FEED.download_info(server_ver)
+        if not d2:
+            return None, delay
 
         print(f"[UPDATE] Disponibilă versiunea {server_ver}")
         return {
             "version": server_ver,
             "notes": notes,
-            "download_url": download_url,
-        }
+            "download_url": d2["url"],
+            "sha256": d2.get("sha256"),
+            "patches": d2.get("patches") or [],
+            "zip_url": d2.get("zip_url"),
+            "zip_sha256": d2.get("zip_sha256"),
+        }, delay
 
     def _update_watcher(self):
         """
-        Verifică update-uri la fiecare 5 minute.
+        Verifică update-uri periodic (implicit 5 minute, sau cât cere serverul).
         Dacă găsește update:
           - dacă nu rulează nimic, declanșează imediat update-ul
           - dacă rulează, setează update_pending și îl face după rundă
         """
-        # mic delay după pornire (lăsăm UI-ul să se inițializeze)
-        time.sleep(10)
+        # mic delay după pornire (lăsăm UI-ul să se inițializeze) + faza
+        # proprie device-ului, ca pornirile simultane să nu lovească serverul în val
+        time.sleep(
+            10 + update_poll_phase(CONFIG.get("device_id", ""), UpdateFeed.DEFAULT_INTERVAL_SEC)
+        )
         if JUST_UPDATED:
             print("[UPDATE] Just updated -> skip checks 10 minute ca anti-loop guard.")
             time.sleep(600)
@@ -1808,23 +4665,30 @@ class FacepostApp:
                     time.sleep(300)
                     continue
 
-                info = self._check_for_update_once()
+                info, delay = self._check_for_update_once()
                 if info is not None:
-                    self.update_info = info
-                    if not self.is_running:
-                        self.root.after(0, self._trigger_auto_update)
-                    else:
-                        self.update_pending = True
+                    # is_running se schimbă în thread-ul Tk -> decidem tot acolo
+                    self.ui.call(self._on_update_found, info)
 
-                time.sleep(300)  # 5 minute
+                # ±10% jitter, ca fazele device-urilor să nu se re-sincronizeze
+                time.sleep(delay * random.uniform(0.9, 1.1))
             except Exception as e:
                 print("[UPDATE] Eroare în update_watcher:", e)
                 time.sleep(300)
 
+    def _on_update_found(self, info: dict):
+        """(thread Tk) Update nou: îl pornim acum sau îl amânăm după rundă."""
+        self.update_info = info
+        self._trigger_auto_update()
+
     def _trigger_auto_update(self):
         """Cheamă start_self_update dacă avem info validă despre update."""
         if not self.update_info:
             return
+        if self.is_running:
+            # o rundă a pornit între timp: _on_run_finished reia update-ul
+            self.update_pending = True
+            return
         try:
             self._start_self_update()
         except Exception as e:
@@ -1832,43 +4696,106 @@ class FacepostApp:
 
     def _start_self_update(self):
         """
-        Creează o copie temporară a exe-ului curent și o pornește în modul '--self-update'.
-        Instanța curentă de Facepost se va închide, iar copia va înlocui exe-ul și va porni noua versiune.
+        Pregătește update-ul fără să oprească aplicația: noua versiune se
+        descarcă și se verifică în fundal, lângă exe-ul curent. Abia apoi
+        pornim updater-ul (modul '--self-update') și închidem aplicația –
+        updater-ul doar face swap-ul, deci pauza e sub o secundă.
         """
         info = self.update_info
         if info is None:
             return
 
-        download_url = info["download_url"]
-        target_ver = info["version"]
-
-        # Dacă rulăm din surse (.py), nu încercăm self-update – doar deschidem linkul
-        if not getattr(sys, "frozen", False):
-            print("[UPDATE] Rulezi din surse (nu exe). Deschid linkul de download.")
-            webbrowser.open(download_url)
+        download_url = info["download_url"]
+        target_ver = info["version"]
+
+        # Dacă rulăm din surse (.py), nu încercăm self-update – doar deschidem linkul
+        if not getattr(sys, "frozen", False):
+            print("[UPDATE] Rulezi din surse (nu exe). Deschid linkul de download.")
+            webbrowser.open(download_url)
+            return
+
+        root = install_root()
+        if root is not None:
+            if not info.get("zip_url") or not info.get("zip_sha256"):
+                print(
+                    "[UPDATE] Serverul nu oferă arhiva one-folder (sau hash-ul ei). "
+                    "Deschid linkul de download."
+                )
+                webbrowser.open(download_url)
+                return
+            staged = root / f"app-{target_ver}"
+            job = (stage_installed_version, info, root)
+        elif is_onedir_install():
+            # one-folder, dar nu în layout-ul versionat: exe-ul singur nu ajunge
+            print("[UPDATE] Instalare one-folder neversionată. Deschid linkul de download.")
+            webbrowser.open(download_url)
+            return
+        else:
+            exe_path = Path(sys.executable).resolve()
+            # lângă exe (același volum) -> updater-ul poate face swap atomic cu os.replace
+            staged = exe_path.with_name(f"{exe_path.stem}.{target_ver}.new")
+            job = (acquire_update, info, exe_path, staged)
+
+        if self.staged_update == staged and staged.exists():
+            self._launch_updater(staged, target_ver)
             return
 
-        exe_path = Path(sys.executable).resolve()
+        self.status_var.set(f"Descarc actualizarea {target_ver} în fundal...")
+        self.tasks.submit(
+            "self_update",
+            *job,
+            on_done=lambda path: self._on_update_staged(path, target_ver),
+            on_error=self._on_update_stage_failed,
+        )
 
-        # copie temporară care va rula ca updater
-        tmp_dir = Path(tempfile.gettempdir())
-        tmp_exe = tmp_dir / "facepost_self_updater.exe"
+    def _on_update_staged(self, staged: Path, target_ver: str):
+        self.staged_update = staged
+        if self.is_running:
+            # nu întrerupem runda curentă; _run_thread lansează update-ul la final
+            print("[UPDATE] Update pregătit; îl aplic după runda curentă.")
+            self.update_pending = True
+            return
+        self._launch_updater(staged, target_ver)
+
+    def _on_update_stage_failed(self, exc: Exception):
+        print("[UPDATE] Nu am putut pregăti update-ul:", exc)
+        if not self.is_running:
+            self.status_var.set("Gata de lucru.")
+        # lăsăm watcher-ul să reîncerce la următorul poll (descărcarea se reia din .part)
+        self.update_info = None
+
+    def _launch_updater(self, staged: Path, target_ver: str):
+        root = install_root()
+        if root is not None:
+            self._switch_installed_version(root, staged)
+            return
 
+        exe_path = Path(sys.executable).resolve()
+        # updater-ul rulează dintr-un hardlink (instant, fără copie de zeci de MB);
+        # dacă TEMP e pe alt volum, revenim la copiere
+        tmp_exe = Path(tempfile.gettempdir()) / "facepost_self_updater.exe"
         try:
-            shutil.copy2(exe_path, tmp_exe)
-        except Exception as e:
-            print("[UPDATE] Nu pot copia exe-ul curent în TEMP:", e)
-            # fallback: măcar deschidem linkul
-            webbrowser.open(download_url)
-            return
+            tmp_exe.unlink(missing_ok=True)
+        except OSError:
+            pass
+        try:
+            os.link(exe_path, tmp_exe)
+        except OSError:
+            try:
+                shutil.copy2(exe_path, tmp_exe)
+            except Exception as e:
+                print("[UPDATE] Nu pot pregăti updater-ul în TEMP:", e)
+                return
 
         args = [
             str(tmp_exe),
             "--self-update",
             "--target",
             str(exe_path),
-            "--url",
-            download_url,
+            "--staged",
+            str(staged),
+            "--parent-pid",
+            str(os.getpid()),
             "--version",
             target_ver,
         ]
@@ -1880,8 +4807,40 @@ class FacepostApp:
             print("[UPDATE] Eroare la lansarea self-updater-ului:", e)
             return
 
-        # închidem UI-ul ca updater-ul să poată lucra liniștit
-        self.root.after(200, self.root.destroy)
+        # închidem UI-ul; updater-ul așteaptă exit-ul nostru și face swap-ul
+        self.exiting_for_update = True
+        self.root.after(0, self.root.destroy)
+
+    def _switch_installed_version(self, root: Path, app_dir: Path):
+        """
+        One-folder: noua versiune e deja extrasă în app_dir, deci nu mai e
+        nevoie de updater – mutăm `current` (fișierele noastre nu sunt
+        atinse) și pornim noua versiune, care așteaptă să ne închidem.
+        """
+        previous = _current_app_dir_name(root)
+        try:
+            activate_installed_version(root, app_dir)
+        except Exception as e:
+            print("[UPDATE] Nu pot activa noua versiune:", e)
+            return
+
+        new_exe = root / INSTALL_CURRENT_LINK / Path(sys.executable).name
+        try:
+            subprocess.Popen(
+                [str(new_exe), "--just-updated", "--parent-pid", str(os.getpid())],
+                close_fds=True,
+            )
+        except Exception as e:
+            print("[UPDATE] Nu pot porni noua versiune, revin:", e)
+            if previous:
+                try:
+                    activate_installed_version(root, root / previous)
+                except Exception as e2:
+                    print("[UPDATE] Revenirea a eșuat:", e2)
+            return
+
+        self.exiting_for_update = True
+        self.root.after(0, self.root.destroy)
 
     # ---------- acțiuni licență ----------
 
@@ -1896,8 +4855,15 @@ class FacepostApp:
         CONFIG["email"] = email
         save_config(CONFIG)
 
-        resp = check_license(email, CONFIG.get("device_id"))
+        self.tasks.submit(
+            "check_license",
+            check_license,
+            email,
+            CONFIG.get("device_id"),
+            on_done=self._on_check_license_done,
+        )
 
+    def _on_check_license_done(self, resp: dict):
         # Dacă avem o eroare HTTP / de API, tratăm în funcție de cod
         if resp.get("error"):
             http_code = resp.get("_http", 0)
@@ -1983,7 +4949,15 @@ class FacepostApp:
         CONFIG["email"] = email
         save_config(CONFIG)
 
-        resp = bind_license(email, CONFIG.get("device_id"))
+        self.tasks.submit(
+            "bind_license",
+            bind_license,
+            email,
+            CONFIG.get("device_id"),
+            on_done=self._on_bind_license_done,
+        )
+
+    def _on_bind_license_done(self, resp: dict):
         if resp.get("error"):
             messagebox.showerror(
                 APP_NAME, f"Eroare la bind: {resp['error']}", parent=self.root
@@ -1996,6 +4970,20 @@ class FacepostApp:
 
         self.license_status_var.set("Licență legată cu succes pe acest device.")
 
+    # ---------- raport selectori ----------
+
+    def show_selector_report(self):
+        """Afișează (și scrie în log) clasamentul selectorilor Facebook învățat din postări."""
+        report = SELECTOR_STATS.report()
+        print("[SELECTORS] Raport:\n" + report)
+
+        win = tk.Toplevel(self.root)
+        win.title(f"{APP_NAME} – raport selectori")
+        text = tk.Text(win, width=140, height=30, font=("Consolas", 9), wrap="none")
+        text.insert("1.0", report)
+        text.configure(state="disabled")
+        text.pack(fill="both", expand=True, padx=8, pady=8)
+
     # ---------- acțiuni imagini ----------
 
     def add_images_clicked(self):
@@ -2053,6 +5041,18 @@ class FacepostApp:
                 )
             return
 
+        if self.login_pending or login_window_open():
+            if not from_scheduler:
+                messagebox.showwarning(
+                    APP_NAME,
+                    "Fereastra de login Facebook este încă deschisă.\n"
+                    "Închide-o după ce te-ai logat, apoi pornește postarea.",
+                    parent=self.root,
+                )
+            else:
+                print("[SCHEDULER] Rundă amânată – fereastra de login Facebook e deschisă.")
+            return
+
         email = self.email_var.get().strip().lower()
         if not email:
             if not from_scheduler:
@@ -2064,7 +5064,20 @@ class FacepostApp:
         CONFIG["email"] = email
         save_config(CONFIG)
 
-        resp = check_license(email, CONFIG.get("device_id"))
+        # verificarea licenței (posibil cu request la server) rulează în fundal;
+        # restul pornirii continuă în _continue_run, înapoi în thread-ul Tk
+        self.tasks.submit(
+            "run_license",
+            cached_check_license,
+            email,
+            CONFIG.get("device_id"),
+            on_done=lambda resp: self._continue_run(resp, simulate, from_scheduler),
+        )
+
+    def _continue_run(self, resp: dict, simulate: bool | None, from_scheduler: bool):
+        if self.is_running:
+            return
+
         if resp.get("error"):
             if not from_scheduler:
                 messagebox.showerror(
@@ -2072,6 +5085,8 @@ class FacepostApp:
                     f"Eroare la check licență: {resp['error']}",
                     parent=self.root,
                 )
+            else:
+                print("[SCHEDULER] Rundă sărită – eroare la check licență:", resp["error"])
             return
         if resp.get("status") not in ("ok",):
             if not from_scheduler:
@@ -2112,12 +5127,16 @@ class FacepostApp:
         if simulate is None:
             simulate = bool(self.simulate_var.get())
 
-        # pregătim flag-ul de oprire pentru această rundă
-        self.stop_event = threading.Event()
+        # pregătim semnalul de oprire pentru această rundă; runda e marcată
+        # ca pornită încă din thread-ul Tk, ca scheduler-ul să n-o dubleze
+        self.cancel_token = CancelToken()
+        self.is_running = True
+        self._update_run_button_text()
+        self.status_var.set("Rulez postările...")
 
         t = threading.Thread(
             target=self._run_thread,
-            args=(groups, text, list(self.images), delay, simulate, self.stop_event),
+            args=(groups, text, list(self.images), delay, simulate, self.cancel_token),
             daemon=True,
         )
         t.start()
@@ -2125,18 +5144,18 @@ class FacepostApp:
     def run_now_clicked(self):
         # Butonul "Postează acum" funcționează ca Start/Stop pentru runda curentă
         if self.is_running:
-            # cerem oprirea rundei curente
-            if self.stop_event is not None:
-                self.stop_event.set()
+            # cerem oprirea rundei curente (are efect în ~o secundă)
+            if self.cancel_token is not None:
+                self.cancel_token.cancel()
+                self.status_var.set("Opresc postările...")
             return
         self.run_now(simulate=None, from_scheduler=False)
 
-    def _run_thread(self, groups, text, images, delay, simulate, stop_event):
-        self.is_running = True
-        self._update_run_button_text()
-        self.status_var.set("Rulez postările...")
+    def _run_thread(self, groups, text, images, delay, simulate, cancel: CancelToken):
+        # thread de lucru: nu atingem Tk, doar publicăm evenimente
+        status = "Rularea s-a oprit cu o eroare."
         try:
-            # log către server (best-effort)
+            # log către server (pus în outbox, trimis în fundal)
             try:
                 resp = log_run(groups, text, images)
                 print("[LOG_RUN]", resp)
@@ -2150,50 +5169,770 @@ class FacepostApp:
                 images,
                 delay,
                 simulate=simulate,
-                stop_event=stop_event,
+                cancel=cancel,
+                # evenimentele poartă token-ul rundei: cele întârziate sunt ignorate
+                progress=lambda p: self.ui.publish("progress", (cancel, p)),
             )
 
-            if stop_event is not None and stop_event.is_set():
-                self.status_var.set(
-                    "Postările au fost oprite la cererea utilizatorului."
-                )
+            if cancel.cancelled:
+                status = "Postările au fost oprite la cererea utilizatorului."
+            elif simulate:
+                status = "Gata (simulare)."
             else:
-                if simulate:
-                    self.status_var.set("Gata (simulare).")
+                status = "Gata – postările ar trebui să fie publicate."
+        finally:
+            self.ui.publish("run_finished", (cancel, status))
+
+    def _on_run_progress(self, event: tuple[CancelToken, RunProgress]):
+        token, progress = event
+        if token is not self.cancel_token:
+            # progres de la o rundă deja terminată
+            return
+        first = self.run_progress is None
+        self.run_progress = progress
+        self.status_var.set(progress.describe())
+        if first:
+            self.root.after(1000, self._tick_run_progress)
+
+    def _tick_run_progress(self):
+        # timpul scurs / rămas se actualizează și între pași
+        if self.run_progress is None or not self.is_running:
+            return
+        self.status_var.set(self.run_progress.describe())
+        self.root.after(1000, self._tick_run_progress)
+
+    def _on_run_finished(self, event: tuple[CancelToken, str]):
+        token, status = event
+        if token is not self.cancel_token:
+            return
+        self.is_running = False
+        self.cancel_token = None
+        self.run_progress = None
+        self.status_var.set(status)
+        self._update_run_button_text()
+
+        # dacă există un update în așteptare, îl declanșăm acum
+        if self.update_pending and self.update_info is not None:
+            print("[UPDATE] Runda s-a terminat, lansez self-update.")
+            self.update_pending = False
+            self._trigger_auto_update()
+
+# ================== DESCĂRCARE UPDATE ==================
+
+class UpdateDownloadError(Exception):
+    """Descărcarea noii versiuni a eșuat sau fișierul nu a trecut verificarea."""
+
+
+def _print_download_progress(done: int, total: int | None) -> None:
+    mb = 1024 * 1024
+    if total:
+        print(f"[SELF-UPDATE] {done * 100 // total}% ({done / mb:.1f}/{total / mb:.1f} MB)")
+    else:
+        print(f"[SELF-UPDATE] {done / mb:.1f} MB descărcați")
+
+
+def download_update(
+    url: str,
+    dest: Path,
+    expected_sha256: str | None = None,
+    progress=_print_download_progress,
+    attempts: int = 6,
+    expect_exe: bool | None = None,
+) -> Path:
+    """
+    Descarcă `url` în `dest` cu reluare (HTTP Range) după întreruperi.
+
+    - datele se scriu în `dest.part`; o descărcare întreruptă (chiar și de
+      la o rulare anterioară) continuă de unde a rămas
+    - chunk-urile se adaptează la viteza legăturii (16 KB .. 1 MB)
+    - SHA-256 se calculează din mers și se compară cu `expected_sha256`
+    - `dest` apare doar dacă fișierul e complet și verificat; altfel
+      se aruncă UpdateDownloadError
+    - `expect_exe` cere verificarea antetului MZ; implicit, doar dacă
+      `dest` se termină în .exe (un fișier staged ".new" trebuie cerut explicit)
+    - un executabil fără SHA-256 și fără lungime cunoscută e refuzat:
+      MZ singur nu dovedește că fișierul e complet
+    - bytes-ii se scriu exact cum vin (fără decodare gzip), altfel
+      offset-ul din Range n-ar corespunde cu fișierul de pe server
+    """
+    import requests
+
+    part = dest.with_name(dest.name + ".part")
+    meta_path = dest.with_name(dest.name + ".part.json")
+    min_chunk, max_chunk = 16 * 1024, 1024 * 1024
+
+    # reluăm doar dacă partea existentă vine de la același URL
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except Exception:
+        meta = {}
+    if meta.get("url") != url:
+        meta = {"url": url}
+        part.unlink(missing_ok=True)
+
+    hasher = hashlib.sha256()
+    done = 0
+    if part.exists():
+        with open(part, "rb") as f:
+            for block in iter(lambda: f.read(max_chunk), b""):
+                hasher.update(block)
+                done += len(block)
+
+    total = meta.get("total")
+    chunk = 64 * 1024
+    last_error: Exception | None = None
+
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+        headers = {"Accept-Encoding": "identity"}
+        if done:
+            headers["Range"] = f"bytes={done}-"
+            if meta.get("etag"):
+                headers["If-Range"] = meta["etag"]
+        try:
+            with requests.get(url, stream=True, timeout=(10, 60), headers=headers) as r:
+                if r.status_code == 416:
+                    # partea locală nu mai corespunde -> o luăm de la capăt
+                    part.unlink(missing_ok=True)
+                    hasher, done, total = hashlib.sha256(), 0, None
+                    raise UpdateDownloadError("HTTP 416 la reluare")
+                r.raise_for_status()
+
+                if r.status_code == 206:
+                    m = re.match(r"bytes (\d+)-\d+/(\d+|\*)", r.headers.get("Content-Range", ""))
+                    if not m or int(m.group(1)) != done:
+                        raise UpdateDownloadError("Content-Range neașteptat la reluare")
+                    if m.group(2) != "*":
+                        total = int(m.group(2))
+                    mode = "ab"
                 else:
-                    self.status_var.set(
-                        "Gata – postările ar trebui să fie publicate."
-                    )
+                    # serverul a trimis tot fișierul (nu suportă Range / s-a schimbat)
+                    if done:
+                        print("[SELF-UPDATE] Serverul nu permite reluarea, descarc de la zero.")
+                    hasher, done = hashlib.sha256(), 0
+                    length = r.headers.get("Content-Length")
+                    total = int(length) if length and length.isdigit() else None
+                    mode = "wb"
+
+                meta.update(total=total, etag=r.headers.get("ETag"))
+                meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+                last_report = 0.0
+                with open(part, mode) as f:
+                    while True:
+                        t0 = time.monotonic()
+                        block = r.raw.read(chunk, decode_content=False)
+                        if not block:
+                            break
+                        f.write(block)
+                        hasher.update(block)
+                        done += len(block)
+                        # chunk mai mare pe legături rapide, mai mic pe cele lente
+                        elapsed = time.monotonic() - t0
+                        if elapsed < 0.1 and chunk < max_chunk:
+                            chunk *= 2
+                        elif elapsed > 0.5 and chunk > min_chunk:
+                            chunk //= 2
+                        if progress and time.monotonic() - last_report >= 0.5:
+                            last_report = time.monotonic()
+                            progress(done, total)
+            if total is not None and done < total:
+                raise UpdateDownloadError(f"descărcare incompletă ({done}/{total} bytes)")
+            break
+        except Exception as e:
+            last_error = e
+            print(f"[SELF-UPDATE] Descărcare întreruptă (încercarea {attempt + 1}/{attempts}):", e)
+    else:
+        raise UpdateDownloadError(f"descărcarea a eșuat: {last_error}")
+
+    if progress:
+        progress(done, total)
+
+    def _discard():
+        part.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+
+    if total is not None and done != total:
+        _discard()
+        raise UpdateDownloadError(f"dimensiune greșită ({done} în loc de {total} bytes)")
+    digest = hasher.hexdigest()
+    if expected_sha256 and digest.lower() != expected_sha256.strip().lower():
+        _discard()
+        raise UpdateDownloadError(f"SHA-256 nu corespunde (primit {digest[:12]}...)")
+    if expect_exe is None:
+        expect_exe = dest.suffix.lower() == ".exe"
+    if expect_exe:
+        if not expected_sha256 and total is None:
+            _discard()
+            raise UpdateDownloadError("executabil fără SHA-256 și fără dimensiune, nu îl instalez")
+        with open(part, "rb") as f:
+            if f.read(2) != b"MZ":
+                _discard()
+                raise UpdateDownloadError("fișierul descărcat nu este un executabil Windows")
+
+    os.replace(part, dest)
+    meta_path.unlink(missing_ok=True)
+    print(f"[SELF-UPDATE] Descărcare verificată ({done} bytes, sha256 {digest[:12]}...)")
+    return dest
+
+
+# ================== DELTA UPDATE ==================
+
+# Format patch "FPDELTA1":
+#   b"FPDELTA1" + sha256(sursă) (32 bytes) + lungime țintă (8 bytes, big endian)
+#   + zlib(operații), unde o operație este:
+#     b"C" + varint(offset) + varint(lungime)  -> copiază din fișierul sursă
+#     b"I" + varint(lungime) + date             -> inserează bytes noi
+# Serverul (în /client-download sau /client-version) anunță patch-urile ca:
+#   "patches": [{"from": "3.1.3", "to": "3.1.4", "url": ..., "sha256": <patch>,
+#                "target_sha256": <exe-ul versiunii "to">}, ...]
+# Patch-urile se generează la release cu: Facepost.exe --make-delta VECHI NOU PATCH
+
+DELTA_MAGIC = b"FPDELTA1"
+DELTA_BLOCK = 64
+DELTA_MAX_CHAIN = 10
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return n, pos
+        shift += 7
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def make_delta(old_path: Path, new_path: Path, patch_path: Path) -> None:
+    """Generează un patch FPDELTA1 (rulat de publisher, nu pe PC-ul clientului)."""
+    import zlib
+
+    old = old_path.read_bytes()
+    new = new_path.read_bytes()
+
+    index: dict[bytes, int] = {}
+    for off in range(0, len(old) - DELTA_BLOCK + 1, DELTA_BLOCK):
+        index.setdefault(old[off:off + DELTA_BLOCK], off)
+
+    ops = bytearray()
+    literal_start = 0
+    i = 0
+    limit = len(new) - DELTA_BLOCK
+    while i <= limit:
+        off = index.get(new[i:i + DELTA_BLOCK])
+        if off is None:
+            i += 1
+            continue
+        # extindem potrivirea cât de mult se poate (întâi în blocuri mari)
+        length = DELTA_BLOCK
+        while (
+            off + length + 4096 <= len(old)
+            and i + length + 4096 <= len(new)
+            and old[off + length:off + length + 4096] == new[i + length:i + length + 4096]
+        ):
+            length += 4096
+        while (
+            off + length < len(old)
+            and i + length < len(new)
+            and old[off + length] == new[i + length]
+        ):
+            length += 1
+        if i > literal_start:
+            ops += b"I"
+            _write_varint(ops, i - literal_start)
+            ops += new[literal_start:i]
+        ops += b"C"
+        _write_varint(ops, off)
+        _write_varint(ops, length)
+        i += length
+        literal_start = i
+    if literal_start < len(new):
+        ops += b"I"
+        _write_varint(ops, len(new) - literal_start)
+        ops += new[literal_start:]
+
+    header = DELTA_MAGIC + hashlib.sha256(old).digest() + len(new).to_bytes(8, "big")
+    patch_path.write_bytes(header + zlib.compress(bytes(ops), 9))
+    print(f"[DELTA] {patch_path}: {patch_path.stat().st_size} bytes (țintă {len(new)} bytes)")
+
+
+def apply_delta(source: Path, patch: Path, output: Path) -> str:
+    """Aplică un patch FPDELTA1 peste `source` în `output`; întoarce sha256 rezultatului."""
+    import zlib
+
+    data = patch.read_bytes()
+    if not data.startswith(DELTA_MAGIC):
+        raise UpdateDownloadError("patch invalid (magic)")
+    pos = len(DELTA_MAGIC)
+    source_sha = data[pos:pos + 32].hex()
+    target_len = int.from_bytes(data[pos + 32:pos + 40], "big")
+    if _file_sha256(source) != source_sha:
+        raise UpdateDownloadError("patch-ul nu corespunde versiunii instalate")
+    ops = zlib.decompress(data[pos + 40:])
+
+    h = hashlib.sha256()
+    written = 0
+    with open(source, "rb") as src, open(output, "wb") as out:
+        i = 0
+        while i < len(ops):
+            op = ops[i:i + 1]
+            i += 1
+            if op == b"C":
+                off, i = _read_varint(ops, i)
+                length, i = _read_varint(ops, i)
+                src.seek(off)
+                block = src.read(length)
+                if len(block) != length:
+                    raise UpdateDownloadError("patch invalid (copy în afara sursei)")
+            elif op == b"I":
+                length, i = _read_varint(ops, i)
+                block = ops[i:i + length]
+                i += length
+            else:
+                raise UpdateDownloadError("patch invalid (operație necunoscută)")
+            out.write(block)
+            h.update(block)
+            written += len(block)
+    if written != target_len:
+        raise UpdateDownloadError("patch invalid (lungime rezultat)")
+    return h.hexdigest()
+
+
+def find_patch_chain(patches: list[dict], from_ver: str, to_ver: str) -> list[dict] | None:
+    """Cel mai scurt lanț de patch-uri from_ver -> to_ver (BFS), sau None."""
+    from collections import deque
+
+    queue = deque([(from_ver, [])])
+    seen = {from_ver}
+    while queue:
+        ver, chain = queue.popleft()
+        if ver == to_ver:
+            return chain
+        if len(chain) >= DELTA_MAX_CHAIN:
+            continue
+        for p in patches or []:
+            if p.get("from") == ver and p.get("to") and p.get("url") and p["to"] not in seen:
+                seen.add(p["to"])
+                queue.append((p["to"], chain + [p]))
+    return None
+
+
+def acquire_update(info: dict, installed: Path, dest: Path) -> Path:
+    """
+    Obține noul exe în `dest`: întâi prin lanț de patch-uri delta aplicate
+    peste `installed`, iar dacă nu există lanț sau ceva eșuează, prin
+    descărcarea completă. Fiecare pas e verificat cu hash-ul țintei.
+    """
+    chain = find_patch_chain(info.get("patches") or [], CLIENT_VERSION, info["version"])
+    if chain:
+        print(f"[SELF-UPDATE] Update delta: {len(chain)} patch-uri de la {CLIENT_VERSION}.")
+        tmp_dir = dest.parent
+        current = installed
+        produced: list[Path] = []
+        try:
+            for step in chain:
+                patch_file = download_update(
+                    step["url"],
+                    tmp_dir / f"facepost_{step['from']}_to_{step['to']}.fpdelta",
+                    expected_sha256=step.get("sha256"),
+                )
+                out = tmp_dir / f"facepost_delta_{step['to']}.exe"
+                digest = apply_delta(current, patch_file, out)
+                patch_file.unlink(missing_ok=True)
+                produced.append(out)
+                expected = step.get("target_sha256")
+                if not expected or digest != expected.lower():
+                    raise UpdateDownloadError(f"rezultatul patch-ului {step['to']} nu corespunde")
+                current = out
+            final = info.get("sha256")
+            if final and _file_sha256(current) != final.lower():
+                raise UpdateDownloadError("rezultatul final nu corespunde hash-ului anunțat")
+            with open(current, "rb") as f:
+                if f.read(2) != b"MZ":
+                    raise UpdateDownloadError("rezultatul patch-urilor nu este un executabil Windows")
+            os.replace(current, dest)
+            print("[SELF-UPDATE] Update delta aplicat și verificat.")
+            return dest
+        except Exception as e:
+            print("[SELF-UPDATE] Update delta eșuat, descarc versiunea completă:", e)
         finally:
-            self.is_running = False
-            self.stop_event = None
-            self._update_run_button_text()
+            for path in produced:
+                if path != dest:
+                    path.unlink(missing_ok=True)
+
+    # `dest` e numele staged (Facepost.<ver>.new) -> verificarea MZ se cere explicit
+    return download_update(
+        info["download_url"], dest, expected_sha256=info.get("sha256"), expect_exe=True
+    )
+
+
+# ================== INSTALARE ONE-FOLDER (VERSIONATĂ) ==================
+#
+# În modul one-folder (PyInstaller --onedir) nu mai despachetăm runtime-ul
+# Python la fiecare pornire. Layout-ul instalării:
+#
+#   C:\Facepost\
+#       app-3.1.3\Facepost.exe (+ _internal\)   <- o versiune completă
+#       app-3.1.4\...
+#       current  -> app-3.1.4                    <- junction; shortcut-ul țintește current\Facepost.exe
+#       install.json                             <- {"current": ..., "previous": ...}
+#       chromedriver.exe                         <- supraviețuiește update-urilor
+#
+# Update = extragem noua versiune în app-<ver> cât aplicația încă rulează,
+# apoi mutăm junction-ul `current`. Versiunea anterioară rămâne pe disc
+# pentru rollback instant (Facepost.exe --rollback).
+
+INSTALL_STATE_NAME = "install.json"
+INSTALL_CURRENT_LINK = "current"
+
+
+def is_onedir_install() -> bool:
+    """True dacă rulăm dintr-un build --onedir (runtime-ul e lângă exe, nu într-un temp)."""
+    meipass = getattr(sys, "_MEIPASS", None)
+    if not getattr(sys, "frozen", False) or not meipass:
+        return False
+    exe_dir = Path(sys.executable).resolve().parent
+    try:
+        Path(meipass).resolve().relative_to(exe_dir)
+    except ValueError:
+        return False  # onefile: _MEIPASS e în %TEMP%\_MEIxxxx
+    return True
+
+
+def install_root() -> Path | None:
+    """
+    Folderul instalării versionate (cel cu `current` și `app-<ver>`),
+    sau None dacă nu rulăm dintr-o astfel de instalare.
+    """
+    if not is_onedir_install():
+        return None
+    # fără resolve(): dacă am pornit prin junction, vrem `current`, nu `app-<ver>`
+    exe_dir = Path(sys.executable).absolute().parent
+    if exe_dir.name == INSTALL_CURRENT_LINK or exe_dir.name.startswith("app-"):
+        return exe_dir.parent
+    return None
+
+
+def _make_dir_link(link: Path, target: Path) -> None:
+    if sys.platform == "win32":
+        # junction, nu symlink: nu cere drepturi de admin / Developer Mode
+        subprocess.run(
+            ["cmd", "/c", "mklink", "/J", str(link), str(target)],
+            check=True,
+            capture_output=True,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+    else:
+        os.symlink(target, link, target_is_directory=True)
+
+
+def _remove_dir_link(link: Path) -> None:
+    """Șterge doar link-ul (junction / symlink), niciodată conținutul țintei."""
+    if not os.path.lexists(link):
+        return
+    try:
+        os.unlink(link)
+    except OSError:
+        os.rmdir(link)
+
+
+def _load_install_state(root: Path) -> dict:
+    try:
+        return json.loads((root / INSTALL_STATE_NAME).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _current_app_dir_name(root: Path) -> str | None:
+    current = root / INSTALL_CURRENT_LINK
+    if not os.path.lexists(current):
+        return None
+    return current.resolve().name
+
+
+def switch_current_version(root: Path, app_dir: Path) -> None:
+    """
+    Mută `current` pe `app_dir`. Link-ul nou se creează separat și ia locul
+    celui vechi prin rename: atomic pe POSIX; pe Windows rename nu poate
+    suprascrie un director, deci sunt două rename-uri consecutive, cu
+    revenire la link-ul vechi dacă al doilea eșuează.
+    """
+    current = root / INSTALL_CURRENT_LINK
+    staging = root / f"{INSTALL_CURRENT_LINK}.new"
+    _remove_dir_link(staging)
+    _make_dir_link(staging, app_dir)
+    try:
+        os.replace(staging, current)
+        return
+    except OSError:
+        pass
+
+    old = root / f"{INSTALL_CURRENT_LINK}.old"
+    _remove_dir_link(old)
+    if os.path.lexists(current):
+        os.rename(current, old)
+    try:
+        os.rename(staging, current)
+    except OSError:
+        if os.path.lexists(old):
+            os.rename(old, current)
+        _remove_dir_link(staging)
+        raise
+    _remove_dir_link(old)
+
+
+def activate_installed_version(root: Path, app_dir: Path, blocked: str | None = None) -> None:
+    """Face din `app_dir` versiunea curentă și reține versiunea anterioară pentru rollback."""
+    previous = _current_app_dir_name(root)
+    switch_current_version(root, app_dir)
+    state = {"current": app_dir.name, "previous": previous}
+    if blocked:
+        state["blocked_version"] = blocked
+    atomic_write_text(root / INSTALL_STATE_NAME, json.dumps(state, indent=2))
+    print(f"[INSTALL] current -> {app_dir.name} (anterior: {previous})")
+
+
+def rollback_install(root: Path) -> Path | None:
+    """
+    Revine la versiunea anterioară (dacă mai e pe disc). Versiunea abandonată
+    e marcată ca blocată, ca auto-update-ul să nu o reinstaleze imediat.
+    Întoarce exe-ul de pornit sau None.
+    """
+    state = _load_install_state(root)
+    previous = state.get("previous")
+    exe_name = Path(sys.executable).name
+    if not previous or not (root / previous / exe_name).exists():
+        print("[INSTALL] Nu există o versiune anterioară pentru rollback.")
+        return None
+    abandoned = _current_app_dir_name(root) or ""
+    activate_installed_version(
+        root, root / previous, blocked=abandoned.removeprefix("app-") or None
+    )
+    return root / INSTALL_CURRENT_LINK / exe_name
+
+
+def other_instances_running(exe_name: str) -> bool:
+    """Mai rulează un alt proces cu același nume de exe (Windows, prin tasklist)?"""
+    if sys.platform != "win32":
+        return False
+    try:
+        out = subprocess.run(
+            ["tasklist", "/FI", f"IMAGENAME eq {exe_name}", "/FO", "CSV", "/NH"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        ).stdout
+    except Exception as e:
+        print("[INSTALL] Nu pot verifica procesele pornite:", e)
+        return False
+    for line in out.splitlines():
+        cols = [c.strip('"') for c in line.split('","')]
+        if len(cols) > 1 and cols[0].lower() == exe_name.lower() and cols[1] != str(os.getpid()):
+            return True
+    return False
+
+
+def blocked_update_version() -> str | None:
+    """Versiunea de la care s-a făcut rollback (nu o mai oferim automat)."""
+    root = install_root()
+    if root is None:
+        return None
+    return _load_install_state(root).get("blocked_version")
+
+
+def stage_installed_version(info: dict, root: Path) -> Path:
+    """
+    Descarcă arhiva one-folder (cu reluare + verificare SHA-256) și o extrage
+    în root/app-<ver>. Rulează cât aplicația veche încă e deschisă; doar
+    schimbarea lui `current` rămâne pentru momentul restartului.
+    Fără `zip_sha256` nu instalăm nimic: arhiva ar fi rulată neverificată.
+    """
+    import zipfile
+
+    if not info.get("zip_sha256"):
+        raise UpdateDownloadError("serverul nu a trimis zip_sha256 pentru arhiva one-folder")
+
+    version = info["version"]
+    exe_name = Path(sys.executable).name
+    app_dir = root / f"app-{version}"
+    if (app_dir / exe_name).exists():
+        return app_dir
+
+    archive = download_update(
+        info["zip_url"],
+        root / f"Facepost-{version}.zip",
+        expected_sha256=info.get("zip_sha256"),
+    )
+    tmp_dir = root / f"app-{version}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            zf.extractall(tmp_dir)
+        # arhiva din release are un folder rădăcină "Facepost\"
+        src = tmp_dir / "Facepost"
+        if not (src / exe_name).exists():
+            src = tmp_dir
+        if not (src / exe_name).exists():
+            raise UpdateDownloadError(f"arhiva nu conține {exe_name}")
+        shutil.rmtree(app_dir, ignore_errors=True)
+        os.rename(src, app_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    archive.unlink(missing_ok=True)
+    print(f"[INSTALL] Versiunea {version} pregătită în {app_dir}")
+    return app_dir
+
+
+def prune_installed_versions(root: Path) -> None:
+    """Șterge versiunile vechi, păstrând doar cea curentă și cea anterioară (rollback)."""
+    state = _load_install_state(root)
+    keep = {_current_app_dir_name(root), state.get("current"), state.get("previous")}
+    for path in root.glob("app-*"):
+        # app-<ver>.tmp = o extragere în curs (stage_installed_version)
+        if path.name in keep or path.name.endswith(".tmp") or not path.is_dir():
+            continue
+        print("[INSTALL] Șterg versiunea veche:", path.name)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# ================== STARTUP TIMING ==================
+
+STARTUP_LOG_FILE = Path.home() / ".facepost_startup.jsonl"
+STARTUP_LOG_MAX_BYTES = 256 * 1024
+STARTUP_TIMES: dict[str, float] = {}
+
+
+def startup_mark(phase: str, started: float) -> None:
+    """Notează durata (ms) unei faze de pornire: import / config / ui / first_paint."""
+    STARTUP_TIMES[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def report_startup_timing() -> None:
+    """
+    Afișează și salvează (JSONL, câte o linie per pornire) timpii de pornire,
+    ca să putem urmări cold start-ul de la o versiune la alta.
+    """
+    STARTUP_TIMES["total"] = round((time.perf_counter() - _T_IMPORT_START) * 1000, 1)
+    entry = {
+        "ts": datetime.now(UTC).isoformat(timespec="seconds"),
+        "version": CLIENT_VERSION,
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "onedir": is_onedir_install(),
+        "just_updated": JUST_UPDATED,
+        **STARTUP_TIMES,
+    }
+    print(
+        "[STARTUP] "
+        + " ".join(f"{k}={v}ms" for k, v in STARTUP_TIMES.items())
+    )
+    try:
+        # păstrăm fișierul mic: dacă a crescut prea mult, rămân doar ultimele linii
+        if STARTUP_LOG_FILE.exists() and STARTUP_LOG_FILE.stat().st_size > STARTUP_LOG_MAX_BYTES:
+            lines = STARTUP_LOG_FILE.read_text(encoding="utf-8").splitlines()[-200:]
+            STARTUP_LOG_FILE.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        with open(STARTUP_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print("[STARTUP] Nu pot salva raportul de pornire:", e)
 
-            # dacă există un update în așteptare, îl declanșăm acum
-            if self.update_pending and self.update_info is not None:
-                print("[UPDATE] Runda s-a terminat, lansez self-update.")
-                self.update_pending = False
-                # trebuie făcut în thread-ul principal Tk
-                self.root.after(0, self._trigger_auto_update)
 
 # ================== MAIN ==================
 
+def wait_for_process_exit(pid: int, timeout: float) -> bool:
+    """
+    Așteaptă terminarea procesului `pid` (fără polling pe Windows:
+    WaitForSingleObject pe handle-ul procesului). True dacă s-a terminat.
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        SYNCHRONIZE = 0x00100000
+        WAIT_OBJECT_0 = 0
+        kernel32 = ctypes.windll.kernel32
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        kernel32.WaitForSingleObject.restype = wintypes.DWORD
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+        handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return True  # procesul nu mai există
+        try:
+            return kernel32.WaitForSingleObject(handle, int(timeout * 1000)) == WAIT_OBJECT_0
+        finally:
+            kernel32.CloseHandle(handle)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _replace_with_retry(src: Path, dst: Path, timeout: float = 15.0) -> None:
+    """os.replace cu reîncercări scurte: handle-ul exe-ului se eliberează la câteva ms după exit."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+
 def run_self_updater():
     """
-    Rulat din copia temporară (facepost_self_updater.exe) cu flagul --self-update.
-    Scop:
-      - așteaptă închiderea exe-ului original
-      - descarcă noua versiune
-      - înlocuiește Facepost.exe
+    Modul updater (--self-update), rulat dintr-un hardlink/copie a exe-ului
+    vechi. Importă doar strictul necesar (fără tkinter / selenium).
+
+    Fluxul normal (--staged): noua versiune e deja descărcată și verificată
+    de aplicație lângă Facepost.exe, deci updater-ul doar:
+      - așteaptă să se închidă procesul părinte (--parent-pid)
+      - face swap-ul Facepost.exe <-> versiunea nouă (os.replace, același volum)
       - pornește noua versiune
+    Fără --staged (compatibilitate), descarcă el noua versiune după ce
+    aplicația s-a închis.
     """
     print("[SELF-UPDATE] Pornit cu argv:", sys.argv)
     argv = sys.argv[1:]
     target = None
     url = None
     version = None
+    sha256 = None
+    info_path = None
+    staged = None
+    parent_pid = None
 
-    i = 0    # mic parser simplu pentru --target / --url / --version
+    i = 0    # mic parser simplu pentru --target / --url / --version / --sha256 / --info / --staged / --parent-pid
     while i < len(argv):
         arg = argv[i]
         if arg == "--self-update":
@@ -2207,72 +5946,94 @@ def run_self_updater():
         elif arg == "--version" and i + 1 < len(argv):
             version = argv[i + 1]
             i += 2
+        elif arg == "--sha256" and i + 1 < len(argv):
+            sha256 = argv[i + 1]
+            i += 2
+        elif arg == "--info" and i + 1 < len(argv):
+            info_path = Path(argv[i + 1])
+            i += 2
+        elif arg == "--staged" and i + 1 < len(argv):
+            staged = Path(argv[i + 1])
+            i += 2
+        elif arg == "--parent-pid" and i + 1 < len(argv):
+            try:
+                parent_pid = int(argv[i + 1])
+            except ValueError:
+                parent_pid = None
+            i += 2
         else:
             i += 1
 
-    if not target or not url:
+    if not target or not (url or staged):
         print("[SELF-UPDATE] Lipsesc parametrii target/url. Ies.")
         if url:
             webbrowser.open(url)
         return
 
-    # 1) așteptăm ca exe-ul țintă să fie liber (să se fi închis Facepost-ul original)
-    for _ in range(60):
+    # 1) așteptăm închiderea Facepost-ului original (eveniment de exit, nu polling)
+    if parent_pid is not None:
+        if not wait_for_process_exit(parent_pid, timeout=120):
+            # fără mesaj, utilizatorul ar crede că update-ul a reușit
+            _msg = (
+                "Facepost nu s-a închis în timp util, așa că update-ul nu a fost "
+                "instalat. Închide aplicația și încearcă din nou."
+            )
+            print("[SELF-UPDATE]", _msg)
+            try:
+                import ctypes
+
+                ctypes.windll.user32.MessageBoxW(None, _msg, APP_NAME, 0x30)
+            except Exception:
+                pass
+            return
+    t_swap = time.perf_counter()
+
+    # 2) fără versiune pregătită: o descărcăm acum (cu reluare + verificare)
+    if staged is None:
         try:
-            with open(target, "rb+"):
-                break
-        except OSError:
-            time.sleep(1)
-    else:
-        print("[SELF-UPDATE] Nu pot obține acces la fișierul țintă. Renunț.")
-        return
+            # lângă țintă (același volum) -> swap atomic cu os.replace
+            staged = target.with_name(f"{target.stem}.{version or 'latest'}.new")
+            info = {"version": version or "", "download_url": url, "sha256": sha256}
+            if info_path is not None:
+                try:
+                    info.update(json.loads(info_path.read_text(encoding="utf-8")))
+                except Exception as e:
+                    print("[SELF-UPDATE] Nu pot citi info-ul de update:", e)
+            print(f"[SELF-UPDATE] Descarc noua versiune în {staged}")
+            acquire_update(info, target, staged)
+        except Exception as e:
+            print("[SELF-UPDATE] Eroare la descărcare:", e)
+            # fallback: deschidem linkul în browser
+            try:
+                webbrowser.open(url)
+            except Exception:
+                pass
+            return
+        t_swap = time.perf_counter()
 
-    # 2) descărcăm noua versiune într-un fișier temporar
+    # 3) swap: exe-ul vechi devine backup (.old), cel nou îi ia locul
+    backup_path = target.with_suffix(target.suffix + ".old")
+    try:
+        backup_path.unlink(missing_ok=True)
+    except OSError:
+        pass
     try:
-        tmp_dir = Path(tempfile.gettempdir())
-        download_path = tmp_dir / f"facepost_update_{int(time.time())}.exe"
-        print(f"[SELF-UPDATE] Descarc noua versiune în {download_path}")
-        with requests.get(url, stream=True, timeout=60) as r:
-            r.raise_for_status()
-            with open(download_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+        _replace_with_retry(target, backup_path)
     except Exception as e:
-        print("[SELF-UPDATE] Eroare la descărcare:", e)
-        # fallback: deschidem linkul în browser
-        try:
-            webbrowser.open(url)
-        except Exception:
-            pass
+        print("[SELF-UPDATE] Nu pot muta exe-ul vechi:", e)
         return
-
-    # 3) backup la exe-ul vechi (opțional)
     try:
-        backup_path = target.with_suffix(target.suffix + ".old")
+        _replace_with_retry(staged, target)
+    except Exception as e:
+        print("[SELF-UPDATE] Nu pot muta noul exe peste țintă:", e)
         try:
-            if backup_path.exists():
-                backup_path.unlink()
+            os.replace(backup_path, target)  # revenim la versiunea veche
         except Exception:
             pass
-
-        try:
-            shutil.move(str(target), str(backup_path))
-            print(f"[SELF-UPDATE] Am mutat vechiul exe la {backup_path}")
-        except Exception as e:
-            print("[SELF-UPDATE] Nu pot muta exe-ul vechi:", e)
-    except Exception as e:
-        print("[SELF-UPDATE] Eroare la backup:", e)
-
-    # 4) mutăm noul exe pe poziția țintă
-    try:
-        shutil.move(str(download_path), str(target))
-        print("[SELF-UPDATE] Noul exe a fost copiat peste țintă.")
-    except Exception as e:
-        print("[SELF-UPDATE] Nu pot muta noul exe peste țintă:", e)
         return
+    print(f"[SELF-UPDATE] Swap făcut în {(time.perf_counter() - t_swap) * 1000:.0f} ms.")
 
-    # 5) pornim Facepost nou
+    # 4) pornim Facepost nou
     try:
         print("[SELF-UPDATE] Pornez noul Facepost:", target)
         subprocess.Popen([str(target), "--just-updated"], close_fds=True)
@@ -2280,19 +6041,91 @@ def run_self_updater():
         print("[SELF-UPDATE] Nu pot porni noul Facepost:", e)
         return
 
-    # nu încercăm să ștergem self_updater-ul din TEMP (Windows nu te lasă să-ți ștergi propriul exe în execuție)
+    # nu încercăm să ștergem updater-ul din TEMP (Windows nu te lasă să-ți ștergi propriul exe în execuție)
     print("[SELF-UPDATE] Gata, ies.")
 
 def main():
+    if JUST_UPDATED and "--parent-pid" in sys.argv:
+        # pornit de versiunea veche (one-folder): o lăsăm să se închidă complet
+        try:
+            if not wait_for_process_exit(
+                int(sys.argv[sys.argv.index("--parent-pid") + 1]), timeout=30
+            ):
+                print("[INSTALL] Versiunea veche încă rulează după 30s, continui oricum.")
+        except (IndexError, ValueError):
+            pass
+    root_dir = install_root()
+    if root_dir is not None:
+        threading.Thread(target=prune_installed_versions, args=(root_dir,), daemon=True).start()
+
+    t = time.perf_counter()
+    init_config()
+    startup_mark("config", t)
+    # retrimitem în fundal telemetria rămasă netrimisă de la rulările anterioare
+    RUN_OUTBOX.start()
+
+    t = time.perf_counter()
+    load_tk()
     root = tk.Tk()
     app = FacepostApp(root)
+    startup_mark("ui", t)
+
+    # first paint = prima afișare a ferestrei principale + desenarea ei (idle)
+    t_paint = time.perf_counter()
+
+    def _on_first_map(event):
+        if event.widget is not root or "first_paint" in STARTUP_TIMES:
+            return
+        STARTUP_TIMES["first_paint"] = -1.0  # marcaj: nu mai intrăm a doua oară
+
+        def _painted():
+            startup_mark("first_paint", t_paint)
+            report_startup_timing()
+
+        root.after_idle(_painted)
+
+    root.bind("<Map>", _on_first_map, add="+")
     root.mainloop()
 
+    # fereastra s-a închis: scriem imediat orice modificare de config rămasă
+    app.tasks.shutdown()
+    DRIVER_SESSION.close()
+    CONFIG_PERSISTER.flush()
+    if app.exiting_for_update:
+        # noua versiune / updater-ul așteaptă exit-ul nostru: nu mai lăsăm
+        # thread-urile rămase (sau handler-ele atexit) să întârzie ieșirea
+        SELECTOR_STATS.flush()
+        sys.stdout.flush()
+        os._exit(0)
+
+
+startup_mark("import", _T_IMPORT_START)
 
 if __name__ == "__main__":
     # dacă a fost pornit cu --self-update, rulăm logica de updater și NU deschidem UI-ul
     if "--self-update" in sys.argv:
         run_self_updater()
+    elif "--rollback" in sys.argv:
+        # instalare one-folder: Facepost.exe --rollback revine la versiunea anterioară;
+        # nu mutăm `current` de sub o instanță care încă rulează
+        _root = install_root()
+        if _root is not None and other_instances_running(Path(sys.executable).name):
+            _msg = "Închide Facepost înainte de rollback (încă rulează o instanță)."
+            print("[INSTALL]", _msg)
+            try:
+                import ctypes
+
+                ctypes.windll.user32.MessageBoxW(None, _msg, APP_NAME, 0x30)
+            except Exception:
+                pass
+        else:
+            _exe = rollback_install(_root) if _root is not None else None
+            if _exe is not None:
+                subprocess.Popen([str(_exe)], close_fds=True)
+    elif "--make-delta" in sys.argv:
+        # unealtă de release: Facepost.exe --make-delta VECHI.exe NOU.exe PATCH.fpdelta
+        _i = sys.argv.index("--make-delta")
+        make_delta(*(Path(a) for a in sys.argv[_i + 1:_i + 4]))
     else:
         main()
 